@@ -0,0 +1,73 @@
+"""Add conversations.message_count and total_tokens and backfill them
+
+Revision ID: 0001_conversation_message_totals
+Revises:
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_conversation_message_totals'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created by create_all after the columns were added already have
+    # them; offline (--sql) runs cannot inspect, so they always emit the DDL
+    existing = set()
+    if not op.get_context().as_sql:
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("conversations")}
+    if "message_count" not in existing:
+        op.add_column(
+            "conversations",
+            sa.Column("message_count", sa.Integer(), nullable=False, server_default="0")
+        )
+    if "total_tokens" not in existing:
+        op.add_column(
+            "conversations",
+            sa.Column("total_tokens", sa.BigInteger(), nullable=False, server_default="0")
+        )
+
+    # Backfill existing conversations; the same UPDATE as
+    # ChatHistoryService.recount_conversation_totals, run on the migration's
+    # connection so it commits together with the new columns
+    conversations = sa.table(
+        "conversations",
+        sa.column("id"),
+        sa.column("message_count"),
+        sa.column("total_tokens"),
+    )
+    messages = sa.table(
+        "messages",
+        sa.column("id"),
+        sa.column("conversation_id"),
+        sa.column("token_count"),
+    )
+    message_count = (
+        sa.select(sa.func.count(messages.c.id))
+        .where(messages.c.conversation_id == conversations.c.id)
+        .scalar_subquery()
+    )
+    total_tokens = (
+        sa.select(sa.func.coalesce(sa.func.sum(messages.c.token_count), 0))
+        .where(messages.c.conversation_id == conversations.c.id)
+        .scalar_subquery()
+    )
+    op.execute(
+        conversations.update().values(message_count=message_count, total_tokens=total_tokens)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.drop_column("total_tokens")
+        batch_op.drop_column("message_count")
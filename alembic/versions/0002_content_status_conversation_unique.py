@@ -0,0 +1,76 @@
+"""Remove duplicate content statuses and make conversation_id unique
+
+Revision ID: 0002_content_status_conversation_unique
+Revises: 0001_conversation_message_totals
+Create Date: 2026-10-16 21:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_content_status_conversation_unique'
+down_revision: Union[str, Sequence[str], None] = '0001_conversation_message_totals'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_unique(table_name: str, columns: list[str]) -> bool:
+    """Whether the live table already enforces uniqueness on exactly these columns"""
+    if op.get_context().as_sql:
+        return False
+    inspector = sa.inspect(op.get_bind())
+    unique_indexes = [
+        index["column_names"] for index in inspector.get_indexes(table_name) if index["unique"]
+    ]
+    unique_constraints = [
+        constraint["column_names"] for constraint in inspector.get_unique_constraints(table_name)
+    ]
+    return columns in unique_indexes + unique_constraints
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _has_unique("content_status", ["conversation_id"]):
+        return
+
+    # create_status used to SELECT then INSERT, so concurrent requests could
+    # store several statuses for one conversation. Keep the most recently
+    # updated one (highest id on ties) and delete the rest
+    content_status = sa.table(
+        "content_status",
+        sa.column("id"),
+        sa.column("conversation_id"),
+        sa.column("updated_at"),
+    )
+    newer = content_status.alias("newer")
+    op.execute(
+        content_status.delete().where(
+            sa.exists().where(
+                newer.c.conversation_id == content_status.c.conversation_id,
+                sa.or_(
+                    newer.c.updated_at > content_status.c.updated_at,
+                    sa.and_(
+                        newer.c.updated_at == content_status.c.updated_at,
+                        newer.c.id > content_status.c.id,
+                    ),
+                ),
+            )
+        )
+    )
+
+    op.create_index(
+        "ux_content_status_conversation", "content_status", ["conversation_id"], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not op.get_context().as_sql:
+        existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("content_status")}
+        if "ux_content_status_conversation" not in existing:
+            return
+    op.drop_index("ux_content_status_conversation", table_name="content_status")
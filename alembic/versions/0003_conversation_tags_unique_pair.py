@@ -0,0 +1,81 @@
+"""Remove duplicate conversation tags and make (conversation_id, tag_id) unique
+
+Revision ID: 0003_conversation_tags_unique_pair
+Revises: 0002_content_status_conversation_unique
+Create Date: 2026-10-16 21:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_conversation_tags_unique_pair'
+down_revision: Union[str, Sequence[str], None] = '0002_content_status_conversation_unique'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_unique(table_name: str, columns: list[str]) -> bool:
+    """Whether the live table already enforces uniqueness on exactly these columns"""
+    if op.get_context().as_sql:
+        return False
+    inspector = sa.inspect(op.get_bind())
+    unique_indexes = [
+        index["column_names"] for index in inspector.get_indexes(table_name) if index["unique"]
+    ]
+    unique_constraints = [
+        constraint["column_names"] for constraint in inspector.get_unique_constraints(table_name)
+    ]
+    return columns in unique_indexes + unique_constraints
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _has_unique("conversation_tags", ["conversation_id", "tag_id"]):
+        return
+
+    # Tagging used to check for the pair and then insert, so concurrent
+    # requests could apply a tag twice. Keep the earliest row for each pair
+    # (lowest id on ties) and delete the rest
+    conversation_tags = sa.table(
+        "conversation_tags",
+        sa.column("id"),
+        sa.column("conversation_id"),
+        sa.column("tag_id"),
+        sa.column("created_at"),
+    )
+    older = conversation_tags.alias("older")
+    op.execute(
+        conversation_tags.delete().where(
+            sa.exists().where(
+                older.c.conversation_id == conversation_tags.c.conversation_id,
+                older.c.tag_id == conversation_tags.c.tag_id,
+                sa.or_(
+                    older.c.created_at < conversation_tags.c.created_at,
+                    sa.and_(
+                        older.c.created_at == conversation_tags.c.created_at,
+                        older.c.id < conversation_tags.c.id,
+                    ),
+                ),
+            )
+        )
+    )
+
+    op.create_index(
+        "ux_conversation_tags_conversation_tag",
+        "conversation_tags",
+        ["conversation_id", "tag_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not op.get_context().as_sql:
+        existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("conversation_tags")}
+        if "ux_conversation_tags_conversation_tag" not in existing:
+            return
+    op.drop_index("ux_conversation_tags_conversation_tag", table_name="conversation_tags")
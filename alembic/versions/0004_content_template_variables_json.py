@@ -0,0 +1,73 @@
+"""Store content_templates.variables as JSON and decode double-encoded rows
+
+Revision ID: 0004_content_template_variables_json
+Revises: 0003_conversation_tags_unique_pair
+Create Date: 2026-10-16 22:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_content_template_variables_json'
+down_revision: Union[str, Sequence[str], None] = '0003_conversation_tags_unique_pair'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _variables_type():
+    """The live type of content_templates.variables, or None offline"""
+    if op.get_context().as_sql:
+        return None
+    columns = sa.inspect(op.get_bind()).get_columns("content_templates")
+    return next(column["type"] for column in columns if column["name"] == "variables")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+
+    # Before the column became JSON, the API stored json.dumps() of a string
+    # that was already a JSON list, so those rows hold a JSON string whose
+    # text is the list. Decode them one level so they load as a list
+    if dialect == "postgresql":
+        if not isinstance(_variables_type(), postgresql.JSONB):
+            op.alter_column(
+                "content_templates",
+                "variables",
+                type_=postgresql.JSONB(),
+                existing_nullable=True,
+                postgresql_using="NULLIF(variables, '')::jsonb",
+            )
+        op.execute(
+            "UPDATE content_templates SET variables = (variables #>> '{}')::jsonb "
+            "WHERE jsonb_typeof(variables) = 'string' AND variables #>> '{}' LIKE '[%'"
+        )
+    elif dialect == "sqlite":
+        # SQLite keeps the text as is; only the double-encoded rows change.
+        # CASE guarantees json_type only sees valid JSON
+        op.execute(
+            "UPDATE content_templates SET variables = json_extract(variables, '$') "
+            "WHERE CASE WHEN json_valid(variables) "
+            "THEN json_type(variables) = 'text' AND json_valid(json_extract(variables, '$')) "
+            "ELSE 0 END"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rows keep their decoded lists, which the old code reads with json.loads
+    if op.get_context().dialect.name == "postgresql":
+        if isinstance(_variables_type(), sa.String):
+            return
+        op.alter_column(
+            "content_templates",
+            "variables",
+            type_=sa.String(),
+            existing_nullable=True,
+            postgresql_using="variables::text",
+        )
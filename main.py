@@ -5,6 +5,7 @@ A minimal FastAPI application with authentication and protected content
 """
 import os
 import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
@@ -20,11 +21,21 @@ from routes.auth import router as auth_router
 from routes.pages import router as pages_router
 from routes.chat import router as chat_router
 from routes.marketing import router as marketing_router
+from services.chat_service import ChatService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close shared outbound HTTP connections on shutdown"""
+    yield
+    await ChatService.close_http_session()
+
 
 app = FastAPI(
     title="AI Chat Application",
     description="A FastAPI application with AI chat functionality powered by Llama 3.3 70B",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 """Configure authentication/session for SQLAdmin login and user authentication"""
@@ -1,12 +1,26 @@
 # =========================
 # models.py
 # =========================
+import os
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
+from sqlalchemy import JSON, BigInteger, Column, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import SQLModel, Field
 
 
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7) so new rows append to the end of the primary key index"""
+    # 48-bit Unix millisecond timestamp followed by 80 random bits
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10))
+    # Stamp the version (7) and the RFC 4122 variant over the random bits
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return uuid.UUID(int=value)
+
+
 class User(SQLModel, table=True):
     __tablename__ = "users"  # type: ignore
 
@@ -68,6 +82,12 @@ class ConversationFolder(SQLModel, table=True):
 
 class Conversation(SQLModel, table=True):
     __tablename__ = "conversations"  # type: ignore
+    __table_args__ = (
+        # Serves the per-user conversation list and its keyset pagination
+        Index("ix_conversations_user_active_updated", "user_id", "is_active", "updated_at", "id"),
+        # Serves the id-ordered walk over active conversations when chunking them all
+        Index("ix_conversations_active_id", "is_active", "id"),
+    )
 
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: Optional[uuid.UUID] = Field(foreign_key="users.id", nullable=True)  # Nullable for anonymous chats
@@ -76,13 +96,16 @@ class Conversation(SQLModel, table=True):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     is_active: bool = Field(default=True)  # For soft deletion
+    # Denormalized message totals, kept current by ChatHistoryService.add_message
+    message_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    total_tokens: int = Field(default=0, sa_type=BigInteger, sa_column_kwargs={"server_default": "0"})
 
 
 class Message(SQLModel, table=True):
     __tablename__ = "messages"  # type: ignore
 
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
-    conversation_id: uuid.UUID = Field(foreign_key="conversations.id", nullable=False)
+    conversation_id: uuid.UUID = Field(foreign_key="conversations.id", index=True, nullable=False)
     role: str = Field(max_length=20, nullable=False)  # user, assistant, system
     content: str = Field(nullable=False)  # The actual message content
     raw_content: Optional[str] = Field(default=None, nullable=True)  # Raw content before formatting
@@ -197,6 +220,10 @@ class Client(SQLModel, table=True):
 
 class Project(SQLModel, table=True):
     __tablename__ = "projects"  # type: ignore
+    __table_args__ = (
+        # Serves the project list and its keyset pagination
+        Index("ix_projects_active_created", "is_active", "created_at", "id"),
+    )
 
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     client_id: uuid.UUID = Field(foreign_key="clients.id")
@@ -215,12 +242,15 @@ class Project(SQLModel, table=True):
 class ContentTemplate(SQLModel, table=True):
     __tablename__ = "content_templates"  # type: ignore
 
-    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: Optional[uuid.UUID] = Field(default_factory=uuid7, primary_key=True)
     name: str = Field(max_length=200, nullable=False)
     description: Optional[str] = Field(default=None, nullable=True)
     content_type: str = Field(max_length=50, nullable=False)  # blog_post, social_media, email, ad_copy, etc.
     template_prompt: str = Field(nullable=False)  # The actual prompt template
-    variables: Optional[str] = Field(default=None, nullable=True)  # JSON list of variable names
+    # Variable names used in template_prompt; JSONB on PostgreSQL, JSON elsewhere
+    variables: Optional[List[str]] = Field(
+        default=None, sa_column=Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    )
     is_active: bool = Field(default=True)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -228,8 +258,18 @@ class ContentTemplate(SQLModel, table=True):
 
 class ContentStatus(SQLModel, table=True):
     __tablename__ = "content_status"  # type: ignore
-
-    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    __table_args__ = (
+        # Serves get_overdue_content (status IN (...) AND due_date < now)
+        Index("ix_content_status_status_due", "status", "due_date"),
+        # Serves get_content_by_status/get_content_by_project and the project FK
+        Index("ix_content_status_project_status", "project_id", "status"),
+        # Serves the assignee filter and the users FK
+        Index("ix_content_status_assigned_to", "assigned_to"),
+        # One status per conversation; create_status upserts on this
+        Index("ux_content_status_conversation", "conversation_id", unique=True),
+    )
+
+    id: Optional[uuid.UUID] = Field(default_factory=uuid7, primary_key=True)
     conversation_id: uuid.UUID = Field(foreign_key="conversations.id")
     project_id: Optional[uuid.UUID] = Field(foreign_key="projects.id", nullable=True)
     status: str = Field(max_length=20, default="draft")  # draft, review, approved, rejected, published
@@ -245,7 +285,7 @@ class ContentStatus(SQLModel, table=True):
 class ContentTag(SQLModel, table=True):
     __tablename__ = "content_tags"  # type: ignore
 
-    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: Optional[uuid.UUID] = Field(default_factory=uuid7, primary_key=True)
     name: str = Field(max_length=100, nullable=False, unique=True)
     color: Optional[str] = Field(max_length=7, default="#3B82F6", nullable=True)  # Hex color
     description: Optional[str] = Field(default=None, nullable=True)
@@ -255,8 +295,13 @@ class ContentTag(SQLModel, table=True):
 
 class ConversationTag(SQLModel, table=True):
     __tablename__ = "conversation_tags"  # type: ignore
+    __table_args__ = (
+        # A tag is applied to a conversation at most once; bulk tagging relies
+        # on this for ON CONFLICT DO NOTHING
+        Index("ux_conversation_tags_conversation_tag", "conversation_id", "tag_id", unique=True),
+    )
 
-    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: Optional[uuid.UUID] = Field(default_factory=uuid7, primary_key=True)
     conversation_id: uuid.UUID = Field(foreign_key="conversations.id")
     tag_id: uuid.UUID = Field(foreign_key="content_tags.id")
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -315,7 +360,7 @@ class ContentTemplateCreate(SQLModel):
     description: Optional[str] = Field(default=None, nullable=True)
     content_type: str = Field(max_length=50, nullable=False)
     template_prompt: str = Field(nullable=False)
-    variables: Optional[str] = Field(default=None, nullable=True)
+    variables: Optional[List[str]] = None
 
 
 class ContentTemplateUpdate(SQLModel):
@@ -323,7 +368,7 @@ class ContentTemplateUpdate(SQLModel):
     description: Optional[str] = Field(default=None, nullable=True)
     content_type: Optional[str] = Field(max_length=50, nullable=True)
     template_prompt: Optional[str] = Field(nullable=True)
-    variables: Optional[str] = Field(default=None, nullable=True)
+    variables: Optional[List[str]] = None
     is_active: Optional[bool] = None
 
 
@@ -135,13 +135,19 @@ def backup_migrations() -> Path | None:
 
 
 def delete_migration_files() -> bool:
-    """Delete all Alembic migration .py files from alembic/versions and clean __pycache__."""
+    """Delete generated Alembic migration .py files from alembic/versions and clean __pycache__.
+
+    Numbered revisions (0001_*.py, ...) ship with the app and are kept.
+    """
     versions_dir = Path("alembic") / "versions"
     if not versions_dir.exists():
         print("❌ No alembic/versions directory found")
         return False
 
-    migration_files = [p for p in versions_dir.glob("*.py") if p.is_file()]
+    migration_files = [
+        p for p in versions_dir.glob("*.py")
+        if p.is_file() and not p.name[:4].isdigit()
+    ]
     if not migration_files:
         print("ℹ️  No migration files to delete")
         # Still attempt to remove __pycache__ if present
@@ -3,13 +3,16 @@ Chat routes for AI chat functionality
 """
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sse_starlette.sse import EventSourceResponse
+from db import get_session
 from services.chat_service import ChatService
 from services.chat_history_service import ChatHistoryService
 from services.folder_service import FolderService
 from services.web_search_service import WebSearchService
 import json
 import uuid
+from datetime import datetime
 from typing import Optional
 
 router = APIRouter()
@@ -205,8 +208,16 @@ async def chat_with_llama_stream(request: Request):
 
 
 @router.get("/api/chat/conversations")
-async def get_conversations(user_id: Optional[str] = None, limit: int = 50, offset: int = 0):
-    """Get conversations for a user"""
+async def get_conversations(
+    user_id: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    after_updated_at: Optional[datetime] = None,
+    after_id: Optional[uuid.UUID] = None,
+    preload_last_message: bool = False,
+    session: AsyncSession = Depends(get_session)
+):
+    """Get conversations for a user, paging with offset or after_updated_at/after_id"""
     try:
         parsed_user_id = None
         if user_id:
@@ -218,22 +229,38 @@ async def get_conversations(user_id: Optional[str] = None, limit: int = 50, offs
                     content={"error": "Invalid user_id format"}
                 )
         
+        # The updated_at and id of the last conversation on a page seek to the next one
+        after = (after_updated_at, after_id) if after_updated_at and after_id else None
         conversations = await ChatHistoryService.get_user_conversations(
-            parsed_user_id, limit=limit, offset=offset
-        )
+            parsed_user_id, limit=limit, offset=offset, after=after, session=session
+        )
+        
+        conversation_list = [
+            {
+                "id": str(conv.id),
+                "title": conv.title,
+                "created_at": conv.created_at.isoformat(),
+                "updated_at": conv.updated_at.isoformat(),
+                "is_active": conv.is_active
+            }
+            for conv in conversations
+        ]
+        
+        if preload_last_message:
+            # One query for the whole page instead of a request per conversation
+            last_messages = await ChatHistoryService.get_last_messages(
+                [conv.id for conv in conversations], session=session
+            )
+            for conv, item in zip(conversations, conversation_list):
+                message = last_messages.get(conv.id)
+                item["last_message"] = {
+                    "id": str(message.id),
+                    "role": message.role,
+                    "content": message.content,
+                    "created_at": message.created_at.isoformat()
+                } if message else None
         
-        return JSONResponse(content={
-            "conversations": [
-                {
-                    "id": str(conv.id),
-                    "title": conv.title,
-                    "created_at": conv.created_at.isoformat(),
-                    "updated_at": conv.updated_at.isoformat(),
-                    "is_active": conv.is_active
-                }
-                for conv in conversations
-            ]
-        })
+        return JSONResponse(content={"conversations": conversation_list})
         
     except Exception as e:
         return JSONResponse(
@@ -243,11 +270,11 @@ async def get_conversations(user_id: Optional[str] = None, limit: int = 50, offs
 
 
 @router.get("/api/chat/conversations/{conversation_id}")
-async def get_conversation(conversation_id: str):
+async def get_conversation(conversation_id: str, session: AsyncSession = Depends(get_session)):
     """Get a specific conversation with its messages"""
     try:
         parsed_conversation_id = uuid.UUID(conversation_id)
-        conversation = await ChatHistoryService.get_conversation(parsed_conversation_id)
+        conversation = await ChatHistoryService.get_conversation(parsed_conversation_id, session=session)
         
         if not conversation:
             return JSONResponse(
@@ -255,7 +282,7 @@ async def get_conversation(conversation_id: str):
                 content={"error": "Conversation not found"}
             )
         
-        messages = await ChatHistoryService.get_conversation_messages(parsed_conversation_id)
+        messages = await ChatHistoryService.get_conversation_messages(parsed_conversation_id, session=session)
         
         # Process messages to convert markdown to HTML for display
         import markdown
@@ -303,7 +330,11 @@ async def get_conversation(conversation_id: str):
 
 
 @router.put("/api/chat/conversations/{conversation_id}/title")
-async def update_conversation_title(conversation_id: str, request: Request):
+async def update_conversation_title(
+    conversation_id: str,
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+):
     """Update conversation title"""
     try:
         parsed_conversation_id = uuid.UUID(conversation_id)
@@ -317,7 +348,7 @@ async def update_conversation_title(conversation_id: str, request: Request):
             )
         
         success = await ChatHistoryService.update_conversation_title(
-            parsed_conversation_id, title
+            parsed_conversation_id, title, session=session
         )
         
         if not success:
@@ -341,11 +372,11 @@ async def update_conversation_title(conversation_id: str, request: Request):
 
 
 @router.delete("/api/chat/conversations/{conversation_id}")
-async def archive_conversation(conversation_id: str):
+async def archive_conversation(conversation_id: str, session: AsyncSession = Depends(get_session)):
     """Archive a conversation (soft delete)"""
     try:
         parsed_conversation_id = uuid.UUID(conversation_id)
-        success = await ChatHistoryService.archive_conversation(parsed_conversation_id)
+        success = await ChatHistoryService.archive_conversation(parsed_conversation_id, session=session)
         
         if not success:
             return JSONResponse(
@@ -5,6 +5,7 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlmodel import Session, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import datetime
 from uuid import UUID
 import uuid
 import logging
@@ -16,6 +17,7 @@ from models import (
     ContentTemplateCreate, ContentTemplateUpdate, ContentStatusCreate, ContentStatusUpdate,
     ContentTagCreate, ContentTagUpdate
 )
+from services.chat_history_service import ChatHistoryService
 from services.client_service import ClientService
 from services.content_template_service import ContentTemplateService
 from services.content_status_service import ContentStatusService
@@ -95,10 +97,16 @@ async def get_projects(
     client_id: Optional[UUID] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after_created_at: Optional[datetime] = Query(None),
+    after_id: Optional[UUID] = Query(None),
     session: Session = Depends(get_session)
 ):
     """Get all active projects, optionally filtered by client"""
-    return await client_service.get_projects(session, client_id=client_id, skip=skip, limit=limit)
+    # The created_at and id of the last project on a page seek to the next one
+    after = (after_created_at, after_id) if after_created_at and after_id else None
+    return await client_service.get_projects(
+        session, client_id=client_id, skip=skip, limit=limit, after=after
+    )
 
 
 @router.get("/projects/{project_id}", response_model=Project)
@@ -147,10 +155,14 @@ async def get_content_templates(
     content_type: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[UUID] = Query(None),
     session: Session = Depends(get_session)
 ):
     """Get all active content templates, optionally filtered by type"""
-    return await template_service.get_templates(session, content_type=content_type, skip=skip, limit=limit)
+    # The id of the last template on a page seeks to the next one
+    return await template_service.get_templates(
+        session, content_type=content_type, skip=skip, limit=limit, after_id=after_id
+    )
 
 
 @router.get("/content-templates/{template_id}", response_model=ContentTemplate)
@@ -204,16 +216,19 @@ async def get_content_statuses(
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[UUID] = Query(None),
     session: Session = Depends(get_session)
 ):
     """Get content statuses with optional filters"""
+    # The id of the last status on a page seeks to the next one
     return await status_service.get_statuses(
         session, 
         conversation_id=conversation_id,
         project_id=project_id,
         status=status,
         skip=skip, 
-        limit=limit
+        limit=limit,
+        after_id=after_id
     )
 
 
@@ -271,10 +286,12 @@ async def delete_content_status(status_id: UUID, session: Session = Depends(get_
 async def get_content_tags(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[UUID] = Query(None),
     session: Session = Depends(get_session)
 ):
     """Get all active content tags"""
-    return await tag_service.get_tags(session, skip=skip, limit=limit)
+    # The id of the last tag on a page seeks to the next one
+    return await tag_service.get_tags(session, skip=skip, limit=limit, after_id=after_id)
 
 
 @router.get("/content-tags/{tag_id}", response_model=ContentTag)
@@ -565,6 +582,7 @@ async def delete_conversation(conversation_id: str, session: AsyncSession = Depe
         # Soft delete by setting is_active to False
         conversation.is_active = False
         await session.commit()
+        ChatHistoryService.invalidate_cached_conversation(conv_id)
         
         return {"message": "Conversation deleted successfully"}
     except HTTPException:
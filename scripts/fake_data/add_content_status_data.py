@@ -60,7 +60,14 @@ async def add_content_status_data():
             # Create ContentStatus records for conversations
             content_status_records = []
             
+            # Each conversation has at most one status; keep any existing ones
+            existing_result = await session.execute(select(ContentStatus.conversation_id))
+            existing_conversation_ids = set(existing_result.scalars().all())
+            
             for i, conversation in enumerate(conversations):
+                if conversation.id in existing_conversation_ids:
+                    continue
+                
                 # Assign a random client and project
                 client = clients[i % len(clients)]
                 project = projects[i % len(projects)]
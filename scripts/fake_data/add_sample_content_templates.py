@@ -6,7 +6,6 @@ Script to add sample content templates for the marketing firm system.
 import asyncio
 import sys
 import os
-import json
 from pathlib import Path
 
 # Add the parent directory to the path so we can import from the project
@@ -38,7 +37,7 @@ Include:
 Target audience: {audience}
 Tone: {tone}
 Word count: {word_count}""",
-            "variables": json.dumps(["topic", "audience", "tone", "word_count"])
+            "variables": ["topic", "audience", "tone", "word_count"]
         },
         {
             "name": "Social Media Post",
@@ -56,7 +55,7 @@ Requirements:
 
 Brand voice: {brand_voice}
 Target audience: {audience}""",
-            "variables": json.dumps(["platform", "topic", "tone", "brand_voice", "audience"])
+            "variables": ["platform", "topic", "tone", "brand_voice", "audience"]
         },
         {
             "name": "Email Newsletter",
@@ -79,7 +78,7 @@ Brand: {brand_name}
 Tone: {tone}
 Target audience: {audience}
 Length: {length}""",
-            "variables": json.dumps(["subject_line", "sender_name", "brand_name", "tone", "audience", "length"])
+            "variables": ["subject_line", "sender_name", "brand_name", "tone", "audience", "length"]
         },
         {
             "name": "Product Description",
@@ -99,7 +98,7 @@ Product category: {category}
 Target audience: {audience}
 Price point: {price_range}
 Tone: {tone}""",
-            "variables": json.dumps(["product_name", "category", "audience", "price_range", "tone"])
+            "variables": ["product_name", "category", "audience", "price_range", "tone"]
         },
         {
             "name": "Press Release",
@@ -119,7 +118,7 @@ Company: {company_name}
 Industry: {industry}
 Tone: Professional and newsworthy
 Target media: {target_media}""",
-            "variables": json.dumps(["announcement", "company_name", "industry", "target_media"])
+            "variables": ["announcement", "company_name", "industry", "target_media"]
         },
         {
             "name": "Landing Page Copy",
@@ -141,7 +140,7 @@ Product/service: {product}
 Target audience: {audience}
 Goal: {conversion_goal}
 Tone: {tone}""",
-            "variables": json.dumps(["offer", "product", "audience", "conversion_goal", "tone"])
+            "variables": ["offer", "product", "audience", "conversion_goal", "tone"]
         },
         {
             "name": "Ad Copy",
@@ -164,7 +163,7 @@ Target audience: {audience}
 Campaign goal: {goal}
 Budget: {budget}
 Tone: {tone}""",
-            "variables": json.dumps(["campaign", "platform", "ad_format", "product", "audience", "goal", "budget", "tone"])
+            "variables": ["campaign", "platform", "ad_format", "product", "audience", "goal", "budget", "tone"]
         },
         {
             "name": "Case Study",
@@ -186,7 +185,7 @@ Service provided: {service}
 Timeline: {timeline}
 Results achieved: {results}
 Tone: Professional and data-driven""",
-            "variables": json.dumps(["client_name", "industry", "service", "timeline", "results"])
+            "variables": ["client_name", "industry", "service", "timeline", "results"]
         }
     ]
     
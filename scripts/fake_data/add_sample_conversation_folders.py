@@ -11,10 +11,10 @@ from models import ConversationFolder, User
 from sqlmodel import select
 
 
-async def add_sample_conversation_folders():
+async def add_sample_conversation_folders(session_factory=AsyncSessionLocal):
     """Add sample conversation folders to the database"""
     
-    async with AsyncSessionLocal() as session:
+    async with session_factory() as session:
         # Get some existing users to assign folders to
         result = await session.execute(select(User).limit(3))
         users = result.scalars().all()
@@ -11,10 +11,10 @@ from models import Conversation, ConversationFolder, User
 from sqlmodel import select
 
 
-async def add_sample_conversations():
+async def add_sample_conversations(session_factory=AsyncSessionLocal):
     """Add sample conversations to the database"""
     
-    async with AsyncSessionLocal() as session:
+    async with session_factory() as session:
         # Get some existing users and folders
         users_result = await session.execute(select(User).limit(3))
         users = users_result.scalars().all()
@@ -12,12 +12,13 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from db import AsyncSessionLocal
 from scripts.fake_data.add_sample_conversation_folders import add_sample_conversation_folders
 from scripts.fake_data.add_sample_conversations import add_sample_conversations
 from scripts.fake_data.add_sample_messages_fixed import add_sample_messages
 
 
-async def setup_conversation_data():
+async def setup_conversation_data(session_factory=AsyncSessionLocal):
     """Set up all conversation-related sample data"""
     
     print("🚀 Setting up conversation browser sample data...")
@@ -26,15 +27,15 @@ async def setup_conversation_data():
     try:
         # Step 1: Create conversation folders
         print("\n📁 Step 1: Creating conversation folders...")
-        await add_sample_conversation_folders()
+        await add_sample_conversation_folders(session_factory)
         
         # Step 2: Create conversations
         print("\n💬 Step 2: Creating conversations...")
-        await add_sample_conversations()
+        await add_sample_conversations(session_factory)
         
         # Step 3: Add messages to conversations
         print("\n📝 Step 3: Adding messages to conversations...")
-        await add_sample_messages()
+        await add_sample_messages(session_factory)
         
         print("\n" + "=" * 60)
         print("✅ Conversation browser sample data setup complete!")
@@ -2,6 +2,7 @@
 # init_db.py - Database initialization script
 # =========================
 import asyncio
+import os
 import sys
 from pathlib import Path
 
@@ -16,7 +17,8 @@ from sqlmodel import SQLModel
 
 async def init_db():
     """Initialize the database by creating all tables."""
-    engine = create_async_engine(DATABASE_URL, echo=True)
+    # DDL logging is opt-in: set SQL_ECHO=1 to see each CREATE statement
+    engine = create_async_engine(DATABASE_URL, echo=os.environ.get("SQL_ECHO") == "1")
     
     # Import all models to register them with SQLModel
     import models
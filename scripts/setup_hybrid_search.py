@@ -9,6 +9,7 @@ import sys
 import os
 import aiosqlite
 import logging
+from contextlib import asynccontextmanager
 
 # Add the current directory to Python path so we can import our modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -16,21 +17,116 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from services.chunking_service import ChunkingService
 from services.embedding_service import EmbeddingService
 from services.hybrid_search_service import HybridSearchService
-from models import Conversation, Document
-from db import AsyncSessionLocal
+from models import Chunk, ChunkEmbedding, Conversation, Document, DocumentChunk, DocumentChunkEmbedding
+from db import AsyncSessionLocal, DATABASE_URL, SQLITE_PRAGMAS, async_engine
+from sqlmodel import select
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def create_fts5_tables():
-    """Create FTS5 virtual tables for full-text search"""
-    logger.info("Creating FTS5 virtual tables...")
-    
-    # Use the same database path as the main application
-    from db import DATABASE_URL
-    
+# SQLite settings for the setup connections: the application's PRAGMAs plus
+# memory-mapped I/O so FTS5 index pages are read without an extra copy
+SETUP_PRAGMAS = (*SQLITE_PRAGMAS, "mmap_size=268435456")  # 256 MB
+
+# Tokenizer and prefix-index options shared by both FTS5 tables. Porter
+# stemming lets 'marketing' match 'market' and 'markets' inside the index;
+# remove_diacritics 2 also folds accents on composed characters. The prefix
+# indexes let prefix queries such as 'market*' resolve without scanning every
+# term.
+FTS5_OPTIONS = """tokenize = 'porter unicode61 remove_diacritics 2',
+    prefix = '2 3 4'"""
+
+# FTS5 virtual table for conversation chunks
+CHUNKS_FTS5_TABLE_DDL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+    content,
+    chunk_type,
+    content='chunks',
+    content_rowid='rowid',
+    {FTS5_OPTIONS}
+);
+"""
+
+# Triggers keeping chunks_fts in sync with steady-state writes to chunks
+CHUNKS_FTS5_TRIGGERS_DDL = """
+CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+    INSERT INTO chunks_fts(rowid, content, chunk_type) 
+    VALUES (new.rowid, new.content, new.chunk_type);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+    INSERT INTO chunks_fts(chunks_fts, rowid, content, chunk_type) 
+    VALUES('delete', old.rowid, old.content, old.chunk_type);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chunks_au AFTER UPDATE ON chunks BEGIN
+    INSERT INTO chunks_fts(chunks_fts, rowid, content, chunk_type) 
+    VALUES('delete', old.rowid, old.content, old.chunk_type);
+    INSERT INTO chunks_fts(rowid, content, chunk_type) 
+    VALUES (new.rowid, new.content, new.chunk_type);
+END;
+"""
+
+# Same for document chunks
+DOCUMENT_CHUNKS_FTS5_TABLE_DDL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS document_chunks_fts USING fts5(
+    content,
+    content='document_chunks',
+    content_rowid='rowid',
+    {FTS5_OPTIONS}
+);
+"""
+
+DOCUMENT_CHUNKS_FTS5_TRIGGERS_DDL = """
+CREATE TRIGGER IF NOT EXISTS document_chunks_ai AFTER INSERT ON document_chunks BEGIN
+    INSERT INTO document_chunks_fts(rowid, content) 
+    VALUES (new.rowid, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS document_chunks_ad AFTER DELETE ON document_chunks BEGIN
+    INSERT INTO document_chunks_fts(document_chunks_fts, rowid, content) 
+    VALUES('delete', old.rowid, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS document_chunks_au AFTER UPDATE ON document_chunks BEGIN
+    INSERT INTO document_chunks_fts(document_chunks_fts, rowid, content) 
+    VALUES('delete', old.rowid, old.content);
+    INSERT INTO document_chunks_fts(rowid, content) 
+    VALUES (new.rowid, new.content);
+END;
+"""
+
+
+# Chunks embedded per OpenAI embeddings request, and how many of those
+# requests may be in flight at once
+EMBEDDING_BATCH_SIZE = 128
+EMBEDDING_CONCURRENCY = 4
+
+# Distinct chunk texts whose embeddings are kept for reuse within one run
+EMBEDDING_CACHE_SIZE = 4096
+
+# New chunks waiting to be embedded while chunking is still running
+EMBEDDING_QUEUE_SIZE = EMBEDDING_BATCH_SIZE
+
+# Conversations or documents chunked at once during setup. Each one commits
+# its chunks, and SQLite admits a single writer, so it chunks one at a time
+CHUNKING_CONCURRENCY = 1 if async_engine.dialect.name == "sqlite" else 8
+
+# Chunking progress is logged once per this many items rather than per item
+PROGRESS_LOG_INTERVAL = 100
+
+# Triggers that keep the FTS5 tables in sync; fts_bulk_mode() drops any left
+# by a previous run and create_fts5_triggers() adds them once the bulk load is done
+FTS5_TRIGGERS = (
+    "chunks_ai", "chunks_ad", "chunks_au",
+    "document_chunks_ai", "document_chunks_ad", "document_chunks_au",
+)
+
+
+def get_database_path():
+    """Get the SQLite file path used by the main application"""
     # Extract the database path from the DATABASE_URL
     if DATABASE_URL.startswith("sqlite+aiosqlite:///"):
         db_path = DATABASE_URL.replace("sqlite+aiosqlite:///", "")
@@ -43,11 +139,29 @@ async def create_fts5_tables():
     else:
         # Fallback to test.db for non-SQLite databases
         db_path = "test.db"
+    return db_path
+
+
+@asynccontextmanager
+async def connect_database(db_path):
+    """Open an aiosqlite connection with SETUP_PRAGMAS applied"""
+    async with aiosqlite.connect(db_path) as db:
+        # Outside any transaction, since journal_mode cannot change inside one
+        await db.executescript("".join(f"PRAGMA {pragma};\n" for pragma in SETUP_PRAGMAS))
+        yield db
+
+
+async def create_fts5_schema():
+    """Create FTS5 virtual tables for full-text search, without their sync triggers"""
+    logger.info("Creating FTS5 virtual tables...")
+    
+    # Use the same database path as the main application
+    db_path = get_database_path()
     
     logger.info(f"Using database path: {db_path}")
     logger.info(f"Database file exists: {os.path.exists(db_path)}")
     
-    async with aiosqlite.connect(db_path) as db:
+    async with connect_database(db_path) as db:
         # Check if required tables exist first
         cursor = await db.execute("""
             SELECT name FROM sqlite_master 
@@ -63,201 +177,278 @@ async def create_fts5_tables():
         if 'document_chunks' not in existing_table_names:
             logger.warning("⚠️  Table 'document_chunks' does not exist. Skipping document chunk FTS setup.")
             return
-        # Enable FTS5 extension
-        await db.execute("PRAGMA compile_options;")
-        
-        # Create FTS5 virtual table for conversation chunks
-        await db.execute("""
-            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
-                content,
-                chunk_type,
-                content='chunks',
-                content_rowid='rowid'
-            );
-        """)
         
-        # Create FTS5 virtual table for document chunks (only if table exists)
+        # Run all DDL as one script in a single transaction: one round trip to
+        # the aiosqlite worker thread instead of one per statement
+        script = "BEGIN;\n" + CHUNKS_FTS5_TABLE_DDL
         if 'document_chunks' in existing_table_names:
-            await db.execute("""
-                CREATE VIRTUAL TABLE IF NOT EXISTS document_chunks_fts USING fts5(
-                    content,
-                    content='document_chunks',
-                    content_rowid='rowid'
-                );
-            """)
-        
-        # Create triggers to keep FTS5 tables in sync
-        await db.execute("""
-            CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
-                INSERT INTO chunks_fts(rowid, content, chunk_type) 
-                VALUES (new.rowid, new.content, new.chunk_type);
-            END;
-        """)
-        
-        await db.execute("""
-            CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
-                INSERT INTO chunks_fts(chunks_fts, rowid, content, chunk_type) 
-                VALUES('delete', old.rowid, old.content, old.chunk_type);
-            END;
-        """)
+            script += DOCUMENT_CHUNKS_FTS5_TABLE_DDL
+        await db.executescript(script + "COMMIT;\n")
         
-        await db.execute("""
-            CREATE TRIGGER IF NOT EXISTS chunks_au AFTER UPDATE ON chunks BEGIN
-                INSERT INTO chunks_fts(chunks_fts, rowid, content, chunk_type) 
-                VALUES('delete', old.rowid, old.content, old.chunk_type);
-                INSERT INTO chunks_fts(rowid, content, chunk_type) 
-                VALUES (new.rowid, new.content, new.chunk_type);
-            END;
+        logger.info("✅ FTS5 virtual tables created successfully")
+
+
+async def create_fts5_triggers(db, fts_tables):
+    """Index every existing row of the given FTS5 tables in one pass, then add their sync triggers"""
+    # 'rebuild' repopulates an external-content table with a single scan of
+    # its content table, replacing any rows indexed by an earlier run
+    script = "BEGIN;\n"
+    if 'chunks_fts' in fts_tables:
+        script += "INSERT INTO chunks_fts(chunks_fts) VALUES('rebuild');\n" + CHUNKS_FTS5_TRIGGERS_DDL
+    if 'document_chunks_fts' in fts_tables:
+        script += (
+            "INSERT INTO document_chunks_fts(document_chunks_fts) VALUES('rebuild');\n"
+            + DOCUMENT_CHUNKS_FTS5_TRIGGERS_DDL
+        )
+    await db.executescript(script + "COMMIT;\n")
+
+
+@asynccontextmanager
+async def fts_bulk_mode():
+    """Keep the FTS5 sync triggers off during a bulk chunk load and index it in one pass afterwards"""
+    async with connect_database(get_database_path()) as db:
+        cursor = await db.execute("""
+            SELECT name FROM sqlite_master 
+            WHERE type='table' AND name IN ('chunks_fts', 'document_chunks_fts')
         """)
+        fts_tables = [row[0] for row in await cursor.fetchall()]
+        if not fts_tables:
+            # FTS5 setup was skipped; nothing to suspend
+            yield
+            return
         
-        # Similar triggers for document chunks (only if table exists)
-        if 'document_chunks' in existing_table_names:
-            await db.execute("""
-                CREATE TRIGGER IF NOT EXISTS document_chunks_ai AFTER INSERT ON document_chunks BEGIN
-                    INSERT INTO document_chunks_fts(rowid, content) 
-                    VALUES (new.rowid, new.content);
-                END;
-            """)
-            
-            await db.execute("""
-                CREATE TRIGGER IF NOT EXISTS document_chunks_ad AFTER DELETE ON document_chunks BEGIN
-                    INSERT INTO document_chunks_fts(document_chunks_fts, rowid, content) 
-                    VALUES('delete', old.rowid, old.content);
-                END;
-            """)
-            
-            await db.execute("""
-                CREATE TRIGGER IF NOT EXISTS document_chunks_au AFTER UPDATE ON document_chunks BEGIN
-                    INSERT INTO document_chunks_fts(document_chunks_fts, rowid, content) 
-                    VALUES('delete', old.rowid, old.content);
-                    INSERT INTO document_chunks_fts(rowid, content) 
-                    VALUES (new.rowid, new.content);
-                END;
-            """)
-        
-        await db.commit()
-        logger.info("✅ FTS5 virtual tables and triggers created successfully")
+        await db.executescript("".join(f"DROP TRIGGER IF EXISTS {name};\n" for name in FTS5_TRIGGERS))
+        try:
+            yield
+        finally:
+            await create_fts5_triggers(db, fts_tables)
+            logger.info("✅ FTS5 indexes rebuilt and triggers created")
 
 
-async def chunk_existing_conversations():
-    """Chunk all existing conversations"""
+async def chunk_existing_conversations(chunk_queue=None):
+    """Chunk all existing conversations, queueing (id, content) for embedding if a queue is given"""
     logger.info("Chunking existing conversations...")
     
     chunking_service = ChunkingService()
     
     async with AsyncSessionLocal() as session:
-        from sqlmodel import select
-        statement = select(Conversation).where(Conversation.is_active)
+        statement = select(Conversation.id, Conversation.title).where(Conversation.is_active)
         result = await session.execute(statement)
-        conversations = result.scalars().all()
-        
-        total_chunks = 0
-        for conversation in conversations:
+        conversations = result.all()
+    
+    # Conversations chunk independently; overlap their database round trips
+    chunking_slots = asyncio.Semaphore(CHUNKING_CONCURRENCY)
+    chunked_count = 0
+    
+    async def chunk_one(conversation):
+        nonlocal chunked_count
+        async with chunking_slots:
             try:
                 chunks = await chunking_service.chunk_conversation(conversation.id)
-                total_chunks += len(chunks)
-                logger.info("Chunked conversation '%s' - %d chunks", conversation.title, len(chunks))
+                chunked_count += 1
+                if chunked_count % PROGRESS_LOG_INTERVAL == 0:
+                    logger.info("Chunked %d/%d conversations", chunked_count, len(conversations))
+                if chunk_queue is not None:
+                    for chunk in chunks:
+                        await chunk_queue.put((chunk.id, chunk.content))
+                return len(chunks)
             except Exception as e:
                 logger.error(f"Error chunking conversation {conversation.id}: {e}")
-        
-        logger.info(f"✅ Chunked {len(conversations)} conversations, created {total_chunks} total chunks")
-        return total_chunks
+                return 0
+    
+    total_chunks = sum(await asyncio.gather(*(chunk_one(c) for c in conversations)))
+    
+    logger.info(f"✅ Chunked {len(conversations)} conversations, created {total_chunks} total chunks")
+    return total_chunks
 
 
-async def chunk_existing_documents():
-    """Chunk all existing documents"""
+async def chunk_existing_documents(chunk_queue=None):
+    """Chunk all existing documents, queueing (id, content) for embedding if a queue is given"""
     logger.info("Chunking existing documents...")
     
     chunking_service = ChunkingService()
     
     async with AsyncSessionLocal() as session:
-        from sqlmodel import select
-        statement = select(Document).where(Document.is_active)
+        statement = select(Document.id, Document.title).where(Document.is_active)
         result = await session.execute(statement)
-        documents = result.scalars().all()
-        
-        total_chunks = 0
-        for document in documents:
+        documents = result.all()
+    
+    # Documents chunk independently; overlap their database round trips
+    chunking_slots = asyncio.Semaphore(CHUNKING_CONCURRENCY)
+    chunked_count = 0
+    
+    async def chunk_one(document):
+        nonlocal chunked_count
+        async with chunking_slots:
             try:
                 chunks = await chunking_service.chunk_document(document.id)
-                total_chunks += len(chunks)
-                logger.info("Chunked document '%s' - %d chunks", document.title, len(chunks))
+                chunked_count += 1
+                if chunked_count % PROGRESS_LOG_INTERVAL == 0:
+                    logger.info("Chunked %d/%d documents", chunked_count, len(documents))
+                if chunk_queue is not None:
+                    for chunk in chunks:
+                        await chunk_queue.put((chunk.id, chunk.content))
+                return len(chunks)
             except Exception as e:
                 logger.error(f"Error chunking document {document.id}: {e}")
-        
-        logger.info(f"✅ Chunked {len(documents)} documents, created {total_chunks} total chunks")
-        return total_chunks
+                return 0
+    
+    total_chunks = sum(await asyncio.gather(*(chunk_one(d) for d in documents)))
+    
+    logger.info(f"✅ Chunked {len(documents)} documents, created {total_chunks} total chunks")
+    return total_chunks
 
 
-async def generate_embeddings():
-    """Generate embeddings for all chunks"""
-    logger.info("Generating embeddings for all chunks...")
+async def embed_chunks(embedding_service, batches, store_embeddings, label):
+    """Embed streamed batches of (id, content) rows, a few requests in flight at once"""
+    request_slots = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+    embedded_count = 0
+    # Embeddings of texts already seen this run; identical chunks reuse them
+    embedding_by_content = {}
     
-    embedding_service = EmbeddingService()
+    async def embed_batch(start, batch):
+        nonlocal embedded_count
+        try:
+            # Generate embeddings for the batch's new distinct texts in one API request
+            new_contents = list(
+                {content: None for _, content in batch if content not in embedding_by_content}
+            )
+            if new_contents:
+                embeddings = await embedding_service.generate_embeddings_batch(new_contents)
+                new_embeddings = dict(zip(new_contents, embeddings))
+                for content, embedding in new_embeddings.items():
+                    if len(embedding_by_content) < EMBEDDING_CACHE_SIZE:
+                        embedding_by_content[content] = embedding
+            else:
+                new_embeddings = {}
+            
+            # Store the batch's embeddings in one transaction
+            await store_embeddings([
+                (chunk_id, new_embeddings.get(content) or embedding_by_content[content])
+                for chunk_id, content in batch
+            ])
+            
+            embedded_count += len(batch)
+            logger.info(f"Generated embeddings for {embedded_count} {label}")
+                
+        except Exception as e:
+            logger.error(f"Error generating embeddings for {label} {start + 1}-{start + len(batch)}: {e}")
+        finally:
+            request_slots.release()
     
-    # Generate embeddings for conversation chunks
+    tasks = []
+    start = 0
+    async for batch in batches:
+        # Waiting for a free slot also caps the batches held in memory
+        await request_slots.acquire()
+        tasks.append(asyncio.create_task(embed_batch(start, batch)))
+        start += len(batch)
+    await asyncio.gather(*tasks)
+    return embedded_count
+
+
+async def generate_chunk_embeddings(embedding_service):
+    """Generate embeddings for conversation chunks that have none"""
     async with AsyncSessionLocal() as session:
-        from sqlmodel import select
-        from models import Chunk, ChunkEmbedding
-        
-        # Get all chunks without embeddings
+        # Stream chunks without embeddings one batch at a time, loading only
+        # the columns the embedding request needs
         statement = (
-            select(Chunk)
+            select(Chunk.id, Chunk.content)
             .outerjoin(ChunkEmbedding, Chunk.id == ChunkEmbedding.chunk_id)
             .where(ChunkEmbedding.chunk_id.is_(None))
+            .execution_options(yield_per=EMBEDDING_BATCH_SIZE)
         )
-        result = await session.execute(statement)
-        chunks = result.scalars().all()
-        
-        logger.info(f"Generating embeddings for {len(chunks)} conversation chunks...")
-        
-        for i, chunk in enumerate(chunks):
-            try:
-                # Generate embedding
-                embedding = await embedding_service.generate_embedding(chunk.content)
-                
-                # Store embedding
-                await embedding_service.store_chunk_embedding(chunk.id, embedding)
-                
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Generated embeddings for {i + 1}/{len(chunks)} chunks")
-                    
-            except Exception as e:
-                logger.error(f"Error generating embedding for chunk {chunk.id}: {e}")
+        result = await session.stream(statement)
         
-        logger.info(f"✅ Generated embeddings for {len(chunks)} conversation chunks")
+        logger.info("Generating embeddings for conversation chunks...")
+        embedded_count = await embed_chunks(
+            embedding_service, result.partitions(), embedding_service.store_chunk_embeddings_bulk, "chunks"
+        )
     
-    # Generate embeddings for document chunks
+    logger.info(f"✅ Generated embeddings for {embedded_count} conversation chunks")
+
+
+async def generate_document_chunk_embeddings(embedding_service):
+    """Generate embeddings for document chunks that have none"""
     async with AsyncSessionLocal() as session:
-        from sqlmodel import select
-        from models import DocumentChunk, DocumentChunkEmbedding
-        
-        # Get all document chunks without embeddings
+        # Stream document chunks without embeddings one batch at a time
         statement = (
-            select(DocumentChunk)
+            select(DocumentChunk.id, DocumentChunk.content)
             .outerjoin(DocumentChunkEmbedding, DocumentChunk.id == DocumentChunkEmbedding.chunk_id)
             .where(DocumentChunkEmbedding.chunk_id.is_(None))
+            .execution_options(yield_per=EMBEDDING_BATCH_SIZE)
         )
-        result = await session.execute(statement)
-        doc_chunks = result.scalars().all()
-        
-        logger.info(f"Generating embeddings for {len(doc_chunks)} document chunks...")
-        
-        for i, chunk in enumerate(doc_chunks):
-            try:
-                # Generate embedding
-                embedding = await embedding_service.generate_embedding(chunk.content)
-                
-                # Store embedding
-                await embedding_service.store_document_chunk_embedding(chunk.id, embedding)
-                
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Generated embeddings for {i + 1}/{len(doc_chunks)} chunks")
-                    
-            except Exception as e:
-                logger.error(f"Error generating embedding for document chunk {chunk.id}: {e}")
+        result = await session.stream(statement)
         
-        logger.info(f"✅ Generated embeddings for {len(doc_chunks)} document chunks")
+        logger.info("Generating embeddings for document chunks...")
+        embedded_count = await embed_chunks(
+            embedding_service,
+            result.partitions(),
+            embedding_service.store_document_chunk_embeddings_bulk,
+            "document chunks"
+        )
+    
+    logger.info(f"✅ Generated embeddings for {embedded_count} document chunks")
+
+
+async def generate_embeddings():
+    """Generate embeddings for all chunks"""
+    logger.info("Generating embeddings for all chunks...")
+    
+    embedding_service = EmbeddingService()
+    
+    # Conversation and document chunks are independent; embed them side by side
+    await asyncio.gather(
+        generate_chunk_embeddings(embedding_service),
+        generate_document_chunk_embeddings(embedding_service)
+    )
+
+
+async def iter_queued_batches(chunk_queue):
+    """Yield full batches of queued (id, content) rows until the None sentinel arrives"""
+    batch = []
+    while (item := await chunk_queue.get()) is not None:
+        batch.append(item)
+        if len(batch) == EMBEDDING_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def chunk_and_embed():
+    """Chunk conversations and documents, embedding the chunks as they are produced"""
+    embedding_service = EmbeddingService()
+    chunk_queue = asyncio.Queue(maxsize=EMBEDDING_QUEUE_SIZE)
+    document_chunk_queue = asyncio.Queue(maxsize=EMBEDDING_QUEUE_SIZE)
+    
+    async def produce(chunk_existing, queue):
+        try:
+            return await chunk_existing(queue)
+        finally:
+            # Tell the embedder that no more chunks are coming
+            await queue.put(None)
+    
+    # The first batch only arrives once chunking has produced a full batch, so
+    # connect to the embeddings endpoint in the meantime
+    conv_chunks, doc_chunks, _, _, _ = await asyncio.gather(
+        embedding_service.warm_up(),
+        produce(chunk_existing_conversations, chunk_queue),
+        produce(chunk_existing_documents, document_chunk_queue),
+        embed_chunks(
+            embedding_service,
+            iter_queued_batches(chunk_queue),
+            embedding_service.store_chunk_embeddings_bulk,
+            "chunks"
+        ),
+        embed_chunks(
+            embedding_service,
+            iter_queued_batches(document_chunk_queue),
+            embedding_service.store_document_chunk_embeddings_bulk,
+            "document chunks"
+        )
+    )
+    return conv_chunks, doc_chunks
 
 
 async def build_faiss_index():
@@ -286,24 +477,30 @@ async def test_hybrid_search():
         "project timeline"
     ]
     
-    for query in test_queries:
+    # Build the FAISS index up front so the concurrent semantic searches share it
+    await hybrid_service.build_faiss_index()
+    
+    async def run_query(query):
+        # Keyword, semantic and hybrid search are independent; run them together
+        return await asyncio.gather(
+            hybrid_service.keyword_search(query, limit=3),
+            hybrid_service.semantic_search(query, limit=3),
+            hybrid_service.hybrid_search(query, limit=3)
+        )
+    
+    all_results = await asyncio.gather(*(run_query(q) for q in test_queries), return_exceptions=True)
+    
+    for query, query_results in zip(test_queries, all_results):
         logger.info(f"\nTesting query: '{query}'")
         
-        try:
-            # Test keyword search
-            keyword_results = await hybrid_service.keyword_search(query, limit=3)
-            logger.info(f"Keyword search found {len(keyword_results)} results")
-            
-            # Test semantic search
-            semantic_results = await hybrid_service.semantic_search(query, limit=3)
-            logger.info(f"Semantic search found {len(semantic_results)} results")
-            
-            # Test hybrid search
-            hybrid_results = await hybrid_service.hybrid_search(query, limit=3)
-            logger.info(f"Hybrid search found {len(hybrid_results)} results")
-            
-        except Exception as e:
-            logger.error(f"Error testing query '{query}': {e}")
+        if isinstance(query_results, Exception):
+            logger.error(f"Error testing query '{query}': {query_results}")
+            continue
+        
+        keyword_results, semantic_results, hybrid_results = query_results
+        logger.info(f"Keyword search found {len(keyword_results)} results")
+        logger.info(f"Semantic search found {len(semantic_results)} results")
+        logger.info(f"Hybrid search found {len(hybrid_results)} results")
     
     logger.info("✅ Hybrid search testing completed")
 
@@ -316,17 +513,22 @@ async def setup_hybrid_search():
     try:
         # Step 1: Create FTS5 virtual tables
         logger.info("\n📊 Step 1: Creating FTS5 virtual tables...")
-        await create_fts5_tables()
-        
-        # Step 2: Chunk existing conversations
-        logger.info("\n📝 Step 2: Chunking existing conversations...")
-        conv_chunks = await chunk_existing_conversations()
+        await create_fts5_schema()
         
-        # Step 3: Chunk existing documents
-        logger.info("\n📄 Step 3: Chunking existing documents...")
-        doc_chunks = await chunk_existing_documents()
+        # Steps 2-3 insert chunks in bulk, so index them in one pass at the end
+        # and only then add the per-row FTS5 triggers for steady-state writes
+        async with fts_bulk_mode():
+            # Step 2: Chunk existing conversations
+            logger.info("\n📝 Step 2: Chunking existing conversations...")
+            
+            # Step 3: Chunk existing documents
+            logger.info("\n📄 Step 3: Chunking existing documents...")
+            
+            # The two steps write disjoint tables, so run them together, and
+            # embed new chunks while chunking is still in progress
+            conv_chunks, doc_chunks = await chunk_and_embed()
         
-        # Step 4: Generate embeddings
+        # Step 4: Generate embeddings for chunks that existed before this run
         logger.info("\n🧠 Step 4: Generating embeddings...")
         await generate_embeddings()
         
@@ -1,10 +1,14 @@
 """
 Chat History Service for managing conversation persistence and retrieval
 """
+import time
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
-from sqlmodel import select, and_
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import lambda_stmt, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select, update, and_, func
 from models import Conversation, Message, Chunk
 from db import AsyncSessionLocal
 from services.chunking_service import ChunkingService
@@ -13,6 +17,59 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# Conversation lookups, LLM context and stats are cached in this process for a
+# few seconds. Writes made through this service drop the conversation's
+# entries at once; code that changes a conversation row directly calls
+# ChatHistoryService.invalidate_cached_conversation after committing. Other
+# processes see changes after at most the TTL.
+CACHE_TTL_SECONDS = 5
+CACHE_MAX_CONVERSATIONS = 1024
+
+
+class _ConversationCache:
+    """Short-lived per-conversation cache of read results"""
+
+    def __init__(self, ttl: float, max_conversations: int):
+        self._ttl = ttl
+        self._max_conversations = max_conversations
+        self._entries: Dict[uuid.UUID, Dict[Any, Tuple[float, Any]]] = {}
+
+    def get(self, conversation_id: uuid.UUID, key: Any) -> Any:
+        """Return the cached value, or None if it is missing or expired"""
+        entry = self._entries.get(conversation_id, {}).get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, conversation_id: uuid.UUID, key: Any, value: Any) -> None:
+        entries = self._entries.get(conversation_id)
+        if entries is None:
+            if len(self._entries) >= self._max_conversations:
+                # Evict the conversation that was cached first
+                del self._entries[next(iter(self._entries))]
+            entries = self._entries[conversation_id] = {}
+        entries[key] = (time.monotonic() + self._ttl, value)
+
+    def invalidate(self, conversation_id: uuid.UUID) -> None:
+        self._entries.pop(conversation_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_cache = _ConversationCache(CACHE_TTL_SECONDS, CACHE_MAX_CONVERSATIONS)
+
+
+@asynccontextmanager
+async def _session_scope(session: Optional[AsyncSession] = None):
+    """Yield the caller's session, or open a new one for the duration of the block"""
+    if session is not None:
+        yield session
+    else:
+        async with AsyncSessionLocal() as new_session:
+            yield new_session
+
+
 class ChatHistoryService:
     """Service for managing chat conversation history"""
 
@@ -20,7 +77,8 @@ class ChatHistoryService:
     async def create_conversation(
         user_id: Optional[uuid.UUID] = None,
         title: Optional[str] = None,
-        folder_id: Optional[uuid.UUID] = None
+        folder_id: Optional[uuid.UUID] = None,
+        session: Optional[AsyncSession] = None
     ) -> Conversation:
         """
         Create a new conversation
@@ -29,49 +87,68 @@ class ChatHistoryService:
             user_id: Optional user ID for authenticated users
             title: Optional conversation title
             folder_id: Optional folder ID to assign conversation to
+            session: Optional session to use; a new one is opened if omitted
             
         Returns:
             Conversation: The created conversation
         """
-        async with AsyncSessionLocal() as session:
+        async with _session_scope(session) as session:
             conversation = Conversation(
                 user_id=user_id,
                 title=title or f"Chat {datetime.now().strftime('%Y-%m-%d %H:%M')}",
                 folder_id=folder_id
             )
             session.add(conversation)
+            # id and timestamps are generated client-side, so no refresh is needed
             await session.commit()
-            await session.refresh(conversation)
             logger.info(f"Created conversation {conversation.id} for user {user_id}")
             return conversation
 
     @staticmethod
-    async def get_conversation(conversation_id: uuid.UUID) -> Optional[Conversation]:
+    async def get_conversation(
+        conversation_id: uuid.UUID,
+        session: Optional[AsyncSession] = None
+    ) -> Optional[Conversation]:
         """
         Get a conversation by ID
         
         Args:
             conversation_id: The conversation UUID
+            session: Optional session to use; a new one is opened if omitted.
+                When given, the cache is skipped and the result is persistent
+                in that session
             
         Returns:
             Conversation or None if not found
         """
-        async with AsyncSessionLocal() as session:
-            statement = select(Conversation).where(
+        if session is None:
+            # Cached as plain column values; each hit gets its own detached instance
+            cached = _cache.get(conversation_id, "conversation")
+            if cached is not None:
+                return Conversation(**cached)
+        
+        async with _session_scope(session) as session:
+            # lambda_stmt builds the statement and its cache key once; later
+            # calls only bind the new conversation_id
+            statement = lambda_stmt(lambda: select(Conversation).where(
                 and_(
                     Conversation.id == conversation_id,
                     Conversation.is_active
                 )
-            )
+            ))
             result = await session.execute(statement)
             conversation = result.scalar_one_or_none()
+            if conversation:
+                _cache.set(conversation_id, "conversation", conversation.model_dump())
             return conversation
 
     @staticmethod
     async def get_user_conversations(
         user_id: uuid.UUID,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+        session: Optional[AsyncSession] = None
     ) -> List[Conversation]:
         """
         Get conversations for a specific user
@@ -80,11 +157,14 @@ class ChatHistoryService:
             user_id: The user UUID
             limit: Maximum number of conversations to return
             offset: Number of conversations to skip
+            after: Optional (updated_at, id) of the last conversation on the
+                previous page; only conversations after it are returned
+            session: Optional session to use; a new one is opened if omitted
             
         Returns:
             List of conversations ordered by updated_at desc
         """
-        async with AsyncSessionLocal() as session:
+        async with _session_scope(session) as session:
             statement = (
                 select(Conversation)
                 .where(
@@ -93,13 +173,52 @@ class ChatHistoryService:
                         Conversation.is_active
                     )
                 )
-                .order_by(Conversation.updated_at.desc())
-                .offset(offset)
-                .limit(limit)
+                .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
             )
+            if after:
+                # Keyset pagination: seek past the previous page through the
+                # index instead of scanning and discarding `offset` rows
+                statement = statement.where(tuple_(Conversation.updated_at, Conversation.id) < after)
+            statement = statement.offset(offset).limit(limit)
             result = await session.execute(statement)
-            conversations = result.scalars().all()
-            return list(conversations)
+            return result.scalars().all()
+
+    @staticmethod
+    async def get_last_messages(
+        conversation_ids: List[uuid.UUID],
+        session: Optional[AsyncSession] = None
+    ) -> Dict[uuid.UUID, Message]:
+        """
+        Get the latest message of each of several conversations in one query
+        
+        Args:
+            conversation_ids: The conversation UUIDs, e.g. one page of a listing
+            session: Optional session to use; a new one is opened if omitted
+            
+        Returns:
+            Dictionary mapping conversation ID to its latest message; conversations
+            without messages are left out
+        """
+        if not conversation_ids:
+            return {}
+        
+        async with _session_scope(session) as session:
+            latest = (
+                select(Message.conversation_id, func.max(Message.created_at).label("created_at"))
+                .where(Message.conversation_id.in_(conversation_ids))
+                .group_by(Message.conversation_id)
+                .subquery()
+            )
+            statement = select(Message).join(
+                latest,
+                and_(
+                    Message.conversation_id == latest.c.conversation_id,
+                    Message.created_at == latest.c.created_at
+                )
+            )
+            result = await session.execute(statement)
+            # Messages sharing the latest timestamp are equally recent; keep one
+            return {message.conversation_id: message for message in result.scalars()}
 
     @staticmethod
     async def add_message(
@@ -108,7 +227,8 @@ class ChatHistoryService:
         content: str,
         raw_content: Optional[str] = None,
         model: Optional[str] = None,
-        token_count: Optional[int] = None
+        token_count: Optional[int] = None,
+        session: Optional[AsyncSession] = None
     ) -> Message:
         """
         Add a message to a conversation
@@ -120,14 +240,31 @@ class ChatHistoryService:
             raw_content: Raw content before formatting
             model: LLM model used
             token_count: Token count for cost tracking
+            session: Optional session to use; a new one is opened if omitted
             
         Returns:
             Message: The created message
         """
-        async with AsyncSessionLocal() as session:
-            # Verify conversation exists and is active
-            conversation = await ChatHistoryService.get_conversation(conversation_id)
-            if not conversation:
+        async with _session_scope(session) as session:
+            # Update conversation's updated_at timestamp and message totals in
+            # one statement; matching no row means the conversation does not
+            # exist or is inactive
+            statement = (
+                update(Conversation)
+                .where(
+                    and_(
+                        Conversation.id == conversation_id,
+                        Conversation.is_active
+                    )
+                )
+                .values(
+                    updated_at=datetime.now(timezone.utc),
+                    message_count=Conversation.message_count + 1,
+                    total_tokens=Conversation.total_tokens + (token_count or 0)
+                )
+            )
+            result = await session.execute(statement)
+            if result.rowcount == 0:
                 raise ValueError(f"Conversation {conversation_id} not found or inactive")
             
             message = Message(
@@ -140,12 +277,9 @@ class ChatHistoryService:
             )
             session.add(message)
             
-            # Update conversation's updated_at timestamp
-            conversation.updated_at = datetime.now(timezone.utc)
-            session.add(conversation)
-            
+            # The message's id and created_at are set client-side, so no refresh
             await session.commit()
-            await session.refresh(message)
+            _cache.invalidate(conversation_id)
             logger.info(f"Added {role} message to conversation {conversation_id}")
             
             # Automatically chunk the new message for search
@@ -158,11 +292,12 @@ class ChatHistoryService:
                 async with AsyncSessionLocal() as chunk_session:
                     from sqlmodel import select
                     
-                    # Get the current chunk index for this conversation
-                    chunk_count_statement = select(Chunk).where(Chunk.conversation_id == conversation_id)
-                    chunk_result = await chunk_session.execute(chunk_count_statement)
-                    existing_chunks = chunk_result.scalars().all()
-                    chunk_index = len(existing_chunks)
+                    # Get the current chunk index for this conversation by
+                    # counting its chunks rather than loading them all
+                    chunk_count_statement = select(func.count(Chunk.id)).where(
+                        Chunk.conversation_id == conversation_id
+                    )
+                    chunk_index = await chunk_session.scalar(chunk_count_statement)
                     
                     # Create chunks for this message
                     for i, chunk_content in enumerate(message_chunks):
@@ -191,7 +326,8 @@ class ChatHistoryService:
     async def get_conversation_messages(
         conversation_id: uuid.UUID,
         limit: Optional[int] = None,
-        offset: int = 0
+        offset: int = 0,
+        session: Optional[AsyncSession] = None
     ) -> List[Message]:
         """
         Get messages for a conversation
@@ -200,11 +336,12 @@ class ChatHistoryService:
             conversation_id: The conversation UUID
             limit: Maximum number of messages to return (None for all)
             offset: Number of messages to skip
+            session: Optional session to use; a new one is opened if omitted
             
         Returns:
             List of messages ordered by created_at asc
         """
-        async with AsyncSessionLocal() as session:
+        async with _session_scope(session) as session:
             statement = (
                 select(Message)
                 .where(Message.conversation_id == conversation_id)
@@ -217,13 +354,13 @@ class ChatHistoryService:
                 statement = statement.offset(offset)
             
             result = await session.execute(statement)
-            messages = result.scalars().all()
-            return list(messages)
+            return result.scalars().all()
 
     @staticmethod
     async def get_recent_messages(
         conversation_id: uuid.UUID,
-        count: int = 10
+        count: int = 10,
+        session: Optional[AsyncSession] = None
     ) -> List[Message]:
         """
         Get the most recent messages from a conversation for context
@@ -231,17 +368,19 @@ class ChatHistoryService:
         Args:
             conversation_id: The conversation UUID
             count: Number of recent messages to return
+            session: Optional session to use; a new one is opened if omitted
             
         Returns:
             List of recent messages ordered by created_at desc
         """
-        async with AsyncSessionLocal() as session:
-            statement = (
+        async with _session_scope(session) as session:
+            # Cached like get_conversation's statement
+            statement = lambda_stmt(lambda: (
                 select(Message)
                 .where(Message.conversation_id == conversation_id)
                 .order_by(Message.created_at.desc())
                 .limit(count)
-            )
+            ))
             result = await session.execute(statement)
             messages = result.scalars().all()
             # Return in chronological order (oldest first)
@@ -250,7 +389,8 @@ class ChatHistoryService:
     @staticmethod
     async def get_conversation_context(
         conversation_id: uuid.UUID,
-        max_messages: int = 20
+        max_messages: int = 20,
+        session: Optional[AsyncSession] = None
     ) -> List[Dict[str, str]]:
         """
         Get conversation context formatted for LLM consumption
@@ -258,27 +398,38 @@ class ChatHistoryService:
         Args:
             conversation_id: The conversation UUID
             max_messages: Maximum number of messages to include in context
+            session: Optional session to use; a new one is opened if omitted
             
         Returns:
             List of message dictionaries with 'role' and 'content' keys
         """
-        messages = await ChatHistoryService.get_recent_messages(
-            conversation_id, max_messages
-        )
+        cached = _cache.get(conversation_id, ("context", max_messages))
+        if cached is not None:
+            return [dict(message) for message in cached]
         
-        context = []
-        for message in messages:
-            context.append({
-                "role": message.role,
-                "content": message.content
-            })
+        async with _session_scope(session) as session:
+            # Only role and content are needed, so select just those columns
+            # rather than loading full Message objects
+            statement = (
+                select(Message.role, Message.content)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at.desc())
+                .limit(max_messages)
+            )
+            result = await session.execute(statement)
+            rows = result.all()
         
+        # Return in chronological order (oldest first)
+        context = [{"role": role, "content": content} for role, content in reversed(rows)]
+        
+        _cache.set(conversation_id, ("context", max_messages), [dict(message) for message in context])
         return context
 
     @staticmethod
     async def update_conversation_title(
         conversation_id: uuid.UUID,
-        title: str
+        title: str,
+        session: Optional[AsyncSession] = None
     ) -> bool:
         """
         Update conversation title
@@ -286,79 +437,154 @@ class ChatHistoryService:
         Args:
             conversation_id: The conversation UUID
             title: New title
+            session: Optional session to use; a new one is opened if omitted
             
         Returns:
             bool: True if updated successfully
         """
-        async with AsyncSessionLocal() as session:
-            conversation = await ChatHistoryService.get_conversation(conversation_id)
-            if not conversation:
+        async with _session_scope(session) as session:
+            statement = (
+                update(Conversation)
+                .where(
+                    and_(
+                        Conversation.id == conversation_id,
+                        Conversation.is_active
+                    )
+                )
+                .values(title=title, updated_at=datetime.now(timezone.utc))
+            )
+            result = await session.execute(statement)
+            if result.rowcount == 0:
                 return False
             
-            conversation.title = title
-            conversation.updated_at = datetime.now(timezone.utc)
-            session.add(conversation)
             await session.commit()
+            _cache.invalidate(conversation_id)
             logger.info(f"Updated conversation {conversation_id} title to: {title}")
             return True
 
     @staticmethod
-    async def archive_conversation(conversation_id: uuid.UUID) -> bool:
+    async def archive_conversation(
+        conversation_id: uuid.UUID,
+        session: Optional[AsyncSession] = None
+    ) -> bool:
         """
         Archive (soft delete) a conversation
         
         Args:
             conversation_id: The conversation UUID
+            session: Optional session to use; a new one is opened if omitted
             
         Returns:
             bool: True if archived successfully
         """
-        async with AsyncSessionLocal() as session:
-            conversation = await ChatHistoryService.get_conversation(conversation_id)
-            if not conversation:
+        async with _session_scope(session) as session:
+            statement = (
+                update(Conversation)
+                .where(
+                    and_(
+                        Conversation.id == conversation_id,
+                        Conversation.is_active
+                    )
+                )
+                .values(is_active=False, updated_at=datetime.now(timezone.utc))
+            )
+            result = await session.execute(statement)
+            if result.rowcount == 0:
                 return False
             
-            conversation.is_active = False
-            conversation.updated_at = datetime.now(timezone.utc)
-            session.add(conversation)
             await session.commit()
+            _cache.invalidate(conversation_id)
             logger.info(f"Archived conversation {conversation_id}")
             return True
 
     @staticmethod
-    async def get_conversation_stats(conversation_id: uuid.UUID) -> Dict[str, Any]:
+    async def get_conversation_stats(
+        conversation_id: uuid.UUID,
+        session: Optional[AsyncSession] = None
+    ) -> Dict[str, Any]:
         """
         Get conversation statistics
         
         Args:
             conversation_id: The conversation UUID
+            session: Optional session to use; a new one is opened if omitted
             
         Returns:
             Dictionary with conversation statistics
         """
-        async with AsyncSessionLocal() as session:
-            # Get message count
-            message_count_statement = select(Message).where(
-                Message.conversation_id == conversation_id
+        cached = _cache.get(conversation_id, "stats")
+        if cached is not None:
+            return dict(cached)
+        
+        async with _session_scope(session) as session:
+            # Message totals are kept on the conversation row by add_message
+            statement = select(Conversation).where(
+                and_(
+                    Conversation.id == conversation_id,
+                    Conversation.is_active
+                )
             )
-            result = await session.execute(message_count_statement)
-            messages = result.scalars().all()
-            message_count = len(messages)
-            
-            # Get total token count
-            total_tokens = sum(msg.token_count or 0 for msg in messages)
-            
-            # Get conversation info
-            conversation = await ChatHistoryService.get_conversation(conversation_id)
+            result = await session.execute(statement)
+            conversation = result.scalar_one_or_none()
             if not conversation:
                 return {}
             
-            return {
+            stats = {
                 "conversation_id": str(conversation_id),
                 "title": conversation.title,
-                "message_count": message_count,
-                "total_tokens": total_tokens,
+                "message_count": conversation.message_count,
+                "total_tokens": conversation.total_tokens,
                 "created_at": conversation.created_at.isoformat(),
                 "updated_at": conversation.updated_at.isoformat(),
                 "is_active": conversation.is_active
             }
+            _cache.set(conversation_id, "stats", dict(stats))
+            return stats
+
+    @staticmethod
+    def invalidate_cached_conversation(conversation_id: uuid.UUID) -> None:
+        """
+        Drop the cached lookup, context and stats of a conversation
+        
+        Call this after committing a change made to a conversation outside
+        this service, so this process stops serving the old values.
+        
+        Args:
+            conversation_id: The conversation UUID
+        """
+        _cache.invalidate(conversation_id)
+
+    @staticmethod
+    async def recount_conversation_totals(session: Optional[AsyncSession] = None) -> int:
+        """
+        Recompute every conversation's message_count and total_tokens from its messages
+        
+        Needed after messages are written without add_message, such as bulk
+        seeding, or after adding the columns to an existing database.
+        
+        Args:
+            session: Optional session to use; a new one is opened if omitted
+            
+        Returns:
+            Number of conversations updated
+        """
+        async with _session_scope(session) as session:
+            message_count = (
+                select(func.count(Message.id))
+                .where(Message.conversation_id == Conversation.id)
+                .scalar_subquery()
+            )
+            total_tokens = (
+                select(func.coalesce(func.sum(Message.token_count), 0))
+                .where(Message.conversation_id == Conversation.id)
+                .scalar_subquery()
+            )
+            statement = update(Conversation).values(
+                message_count=message_count,
+                total_tokens=total_tokens
+            )
+            result = await session.execute(statement)
+            await session.commit()
+            _cache.clear()
+            logger.info(f"Recounted message totals for {result.rowcount} conversations")
+            return result.rowcount
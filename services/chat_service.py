@@ -9,6 +9,7 @@ import logging
 import uuid
 from typing import Dict, Any, AsyncGenerator, Optional, List
 from fastapi import HTTPException
+from db import AsyncSessionLocal
 from services.chat_history_service import ChatHistoryService
 from services.title_generation_service import TitleGenerationService
 from services.web_search_service import WebSearchService
@@ -31,6 +32,25 @@ class ChatService:
     
     # Initialize web search service
     _web_search_service = WebSearchService()
+    
+    # Shared HTTP session so OpenRouter requests reuse pooled keep-alive connections
+    _http_session: Optional[aiohttp.ClientSession] = None
+    
+    @staticmethod
+    def _get_http_session() -> aiohttp.ClientSession:
+        """Get the shared aiohttp session, creating it on first use"""
+        if ChatService._http_session is None or ChatService._http_session.closed:
+            ChatService._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+            )
+        return ChatService._http_session
+    
+    @staticmethod
+    async def close_http_session() -> None:
+        """Close the shared aiohttp session"""
+        if ChatService._http_session is not None:
+            await ChatService._http_session.close()
+            ChatService._http_session = None
 
     @staticmethod
     async def test_connection() -> Dict[str, Any]:
@@ -65,31 +85,31 @@ class ChatService:
             
             print("DEBUG: Making test request to OpenRouter...")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers=headers,
-                    json=test_payload
-                ) as response:
-                    print(f"DEBUG: Test response status: {response.status}")
+            session = ChatService._get_http_session()
+            async with session.post(
+                "https://openrouter.ai/api/v1/chat/completions",
+                headers=headers,
+                json=test_payload
+            ) as response:
+                print(f"DEBUG: Test response status: {response.status}")
+                
+                if response.status == 200:
+                    result = await response.json()
+                    print(f"DEBUG: Test response: {result}")
+                    return {
+                        "status": "success", 
+                        "message": "API connection successful",
+                        "response": result
+                    }
+                else:
+                    error_text = await response.text()
+                    print(f"DEBUG: Test error: {error_text}")
+                    return {
+                        "status": "error",
+                        "message": f"API error: {error_text}",
+                        "status_code": response.status
+                    }
                     
-                    if response.status == 200:
-                        result = await response.json()
-                        print(f"DEBUG: Test response: {result}")
-                        return {
-                            "status": "success", 
-                            "message": "API connection successful",
-                            "response": result
-                        }
-                    else:
-                        error_text = await response.text()
-                        print(f"DEBUG: Test error: {error_text}")
-                        return {
-                            "status": "error",
-                            "message": f"API error: {error_text}",
-                            "status_code": response.status
-                        }
-                        
         except Exception as e:
             print(f"DEBUG: Test exception: {e}")
             return {"status": "error", "message": f"Exception: {str(e)}"}
@@ -207,46 +227,47 @@ class ChatService:
             print(f"DEBUG: Making request to OpenRouter with payload: {json.dumps(payload, indent=2)}")
             
             # Make request to OpenRouter
-            async with aiohttp.ClientSession() as session:
-                print("DEBUG: Created aiohttp session")
-                async with session.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    print(f"DEBUG: Got response from OpenRouter, status: {response.status}")
-                    logger.info(f"OpenRouter response status: {response.status}")
-                    logger.info(f"OpenRouter response headers: {dict(response.headers)}")
-                    
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"OpenRouter API error: {error_text}")
-                        raise HTTPException(status_code=500, detail=f"OpenRouter API error: {error_text}")
-                    
-                    result = await response.json()
-                    logger.info(f"OpenRouter response: {json.dumps(result, indent=2)}")
-                    print(f"DEBUG: OpenRouter response: {json.dumps(result, indent=2)}")
-                    
-                    # Extract the assistant's response
-                    assistant_message = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                    
-                    if not assistant_message:
-                        logger.warning("No assistant message content found in response")
-                        logger.warning(f"Full response structure: {result}")
-                        print("DEBUG: No assistant message content found in response")
-                        print(f"DEBUG: Full response structure: {result}")
-                    
-                    # Convert markdown to HTML
-                    formatted_html = markdown.markdown(
-                        assistant_message,
-                        extensions=['fenced_code', 'codehilite', 'tables', 'nl2br']
-                    )
-                    
+            session = ChatService._get_http_session()
+            async with session.post(
+                "https://openrouter.ai/api/v1/chat/completions",
+                headers=headers,
+                json=payload
+            ) as response:
+                print(f"DEBUG: Got response from OpenRouter, status: {response.status}")
+                logger.info(f"OpenRouter response status: {response.status}")
+                logger.info(f"OpenRouter response headers: {dict(response.headers)}")
+                
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"OpenRouter API error: {error_text}")
+                    raise HTTPException(status_code=500, detail=f"OpenRouter API error: {error_text}")
+                
+                result = await response.json()
+                logger.info(f"OpenRouter response: {json.dumps(result, indent=2)}")
+                print(f"DEBUG: OpenRouter response: {json.dumps(result, indent=2)}")
+                
+                # Extract the assistant's response
+                assistant_message = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                
+                if not assistant_message:
+                    logger.warning("No assistant message content found in response")
+                    logger.warning(f"Full response structure: {result}")
+                    print("DEBUG: No assistant message content found in response")
+                    print(f"DEBUG: Full response structure: {result}")
+                
+                # Convert markdown to HTML
+                formatted_html = markdown.markdown(
+                    assistant_message,
+                    extensions=['fenced_code', 'codehilite', 'tables', 'nl2br']
+                )
+                
+                # Persist the exchange through one session instead of one per call
+                async with AsyncSessionLocal() as db_session:
                     # Check if this is the first exchange BEFORE adding messages
                     is_first_exchange = False
                     try:
                         conversation_context = await ChatHistoryService.get_conversation_context(
-                            conversation_id, max_messages=10
+                            conversation_id, max_messages=10, session=db_session
                         )
                         # If we have 0 messages in context, this is the first exchange
                         is_first_exchange = len(conversation_context) == 0
@@ -257,7 +278,8 @@ class ChatService:
                     await ChatHistoryService.add_message(
                         conversation_id=conversation_id,
                         role="user",
-                        content=user_message
+                        content=user_message,
+                        session=db_session
                     )
                     
                     await ChatHistoryService.add_message(
@@ -265,7 +287,8 @@ class ChatService:
                         role="assistant",
                         content=assistant_message,
                         raw_content=assistant_message,
-                        model=LLM_MODEL
+                        model=LLM_MODEL,
+                        session=db_session
                     )
                     
                     # Generate and update conversation title if this is the first exchange
@@ -277,24 +300,24 @@ class ChatService:
                             
                             # Update the conversation title
                             await ChatHistoryService.update_conversation_title(
-                                conversation_id, generated_title
+                                conversation_id, generated_title, session=db_session
                             )
                             logger.info(f"Updated conversation {conversation_id} title to: {generated_title}")
                             
                         except Exception as e:
                             logger.error(f"Error generating title for conversation {conversation_id}: {e}")
                             # Don't fail the entire request if title generation fails
-                    
-                    logger.info(f"Successfully processed response, length: {len(assistant_message)}")
-                    print(f"DEBUG: Successfully processed response, length: {len(assistant_message)}")
-                    
-                    return {
-                        "response": formatted_html,
-                        "raw_response": assistant_message,  # Keep original for debugging
-                        "model": LLM_MODEL,
-                        "conversation_id": str(conversation_id)
-                    }
-                    
+                
+                logger.info(f"Successfully processed response, length: {len(assistant_message)}")
+                print(f"DEBUG: Successfully processed response, length: {len(assistant_message)}")
+                
+                return {
+                    "response": formatted_html,
+                    "raw_response": assistant_message,  # Keep original for debugging
+                    "model": LLM_MODEL,
+                    "conversation_id": str(conversation_id)
+                }
+                
         except json.JSONDecodeError as e:
             logger.error(f"JSON decode error: {e}")
             print(f"DEBUG: JSON decode error: {e}")
@@ -414,77 +437,79 @@ class ChatService:
             logger.info(f"Making streaming request to OpenRouter with payload: {json.dumps(payload, indent=2)}")
             
             # Make streaming request to OpenRouter
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    logger.info(f"OpenRouter streaming response status: {response.status}")
-                    logger.info(f"OpenRouter streaming response headers: {dict(response.headers)}")
-                    
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"OpenRouter API streaming error: {error_text}")
-                        raise HTTPException(status_code=500, detail=f"OpenRouter API error: {error_text}")
-                    
-                    # Accumulate raw content for markdown processing
-                    accumulated_content = ""
-                    chunk_count = 0
-                    
-                    logger.info("Starting to stream response...")
-                    
-                    # Stream the response
-                    async for line in response.content:
-                        line = line.decode('utf-8').strip()
-                        if line.startswith('data: '):
-                            data = line[6:]  # Remove 'data: ' prefix
-                            if data == '[DONE]':
-                                logger.info("Stream completed with [DONE]")
-                                break
+            session = ChatService._get_http_session()
+            async with session.post(
+                "https://openrouter.ai/api/v1/chat/completions",
+                headers=headers,
+                json=payload
+            ) as response:
+                logger.info(f"OpenRouter streaming response status: {response.status}")
+                logger.info(f"OpenRouter streaming response headers: {dict(response.headers)}")
+                
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"OpenRouter API streaming error: {error_text}")
+                    raise HTTPException(status_code=500, detail=f"OpenRouter API error: {error_text}")
+                
+                # Accumulate raw content for markdown processing
+                accumulated_content = ""
+                chunk_count = 0
+                
+                logger.info("Starting to stream response...")
+                
+                # Stream the response
+                async for line in response.content:
+                    line = line.decode('utf-8').strip()
+                    if line.startswith('data: '):
+                        data = line[6:]  # Remove 'data: ' prefix
+                        if data == '[DONE]':
+                            logger.info("Stream completed with [DONE]")
+                            break
+                        
+                        try:
+                            chunk = json.loads(data)
+                            chunk_count += 1
+                            logger.debug(f"Received chunk {chunk_count}: {chunk}")
                             
-                            try:
-                                chunk = json.loads(data)
-                                chunk_count += 1
-                                logger.debug(f"Received chunk {chunk_count}: {chunk}")
-                                
-                                if 'choices' in chunk and len(chunk['choices']) > 0:
-                                    delta = chunk['choices'][0].get('delta', {})
-                                    content = delta.get('content', '')
-                                    if content:
-                                        # Accumulate the raw content
-                                        accumulated_content += content
-                                        
-                                        # Convert accumulated content to HTML
-                                        formatted_html = markdown.markdown(
-                                            accumulated_content,
-                                            extensions=['fenced_code', 'codehilite', 'tables', 'nl2br']
-                                        )
-                                        # free model is meta-llama/llama-3.3-70b-instruct:free
-                                        # https://openrouter.ai/meta-llama/llama-3.3-70b-instruct:free/api
-                                        # paid model is meta-llama/llama-3.3-70b-instruct
-                                        yield {
-                                            "content": formatted_html,
-                                            "raw_content": accumulated_content,
-                                            "model": LLM_MODEL,
-                                            "conversation_id": str(conversation_id)
-                                        }
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"JSON decode error in chunk: {e}, chunk: {data}")
-                                continue  # Skip invalid JSON chunks
-                    
-                    logger.info(
-                        f"Streaming completed. Total chunks: {chunk_count}, "
-                        f"Final content length: {len(accumulated_content)}"
-                    )
-                    
-                    # Save messages to conversation history after streaming completes
-                    if accumulated_content:
+                            if 'choices' in chunk and len(chunk['choices']) > 0:
+                                delta = chunk['choices'][0].get('delta', {})
+                                content = delta.get('content', '')
+                                if content:
+                                    # Accumulate the raw content
+                                    accumulated_content += content
+                                    
+                                    # Convert accumulated content to HTML
+                                    formatted_html = markdown.markdown(
+                                        accumulated_content,
+                                        extensions=['fenced_code', 'codehilite', 'tables', 'nl2br']
+                                    )
+                                    # free model is meta-llama/llama-3.3-70b-instruct:free
+                                    # https://openrouter.ai/meta-llama/llama-3.3-70b-instruct:free/api
+                                    # paid model is meta-llama/llama-3.3-70b-instruct
+                                    yield {
+                                        "content": formatted_html,
+                                        "raw_content": accumulated_content,
+                                        "model": LLM_MODEL,
+                                        "conversation_id": str(conversation_id)
+                                    }
+                        except json.JSONDecodeError as e:
+                            logger.warning(f"JSON decode error in chunk: {e}, chunk: {data}")
+                            continue  # Skip invalid JSON chunks
+                
+                logger.info(
+                    f"Streaming completed. Total chunks: {chunk_count}, "
+                    f"Final content length: {len(accumulated_content)}"
+                )
+                
+                # Save messages to conversation history after streaming completes
+                if accumulated_content:
+                    # Persist the exchange through one session instead of one per call
+                    async with AsyncSessionLocal() as db_session:
                         # Check if this is the first exchange BEFORE adding messages
                         is_first_exchange = False
                         try:
                             conversation_context = await ChatHistoryService.get_conversation_context(
-                                conversation_id, max_messages=10
+                                conversation_id, max_messages=10, session=db_session
                             )
                             # If we have 0 messages in context, this is the first exchange
                             is_first_exchange = len(conversation_context) == 0
@@ -494,7 +519,8 @@ class ChatService:
                         await ChatHistoryService.add_message(
                             conversation_id=conversation_id,
                             role="user",
-                            content=user_message
+                            content=user_message,
+                            session=db_session
                         )
                         
                         await ChatHistoryService.add_message(
@@ -502,7 +528,8 @@ class ChatService:
                             role="assistant",
                             content=accumulated_content,
                             raw_content=accumulated_content,
-                            model=LLM_MODEL
+                            model=LLM_MODEL,
+                            session=db_session
                         )
                         
                         # Generate and update conversation title if this is the first exchange
@@ -514,14 +541,14 @@ class ChatService:
                                 
                                 # Update the conversation title
                                 await ChatHistoryService.update_conversation_title(
-                                    conversation_id, generated_title
+                                    conversation_id, generated_title, session=db_session
                                 )
                                 logger.info(f"Updated conversation {conversation_id} title to: {generated_title}")
                                 
                             except Exception as e:
                                 logger.error(f"Error generating title for conversation {conversation_id}: {e}")
                                 # Don't fail the entire request if title generation fails
-                    
+                
         except Exception as e:
             logger.error(f"Unexpected error in streaming: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -3,13 +3,22 @@ Chunking Service for breaking conversations and documents into searchable chunks
 """
 import uuid
 import re
-from typing import List, Optional
+from collections import defaultdict
+from typing import Iterable, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Chunk, Message, Conversation, Document, DocumentChunk
 from db import AsyncSessionLocal
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Conversations or documents chunked per transaction by chunk_all_*
+CHUNK_ALL_PAGE_SIZE = 500
+
+# Messages fetched per round trip when chunking a single conversation
+CHUNK_MESSAGES_BATCH_SIZE = 1000
+
+
 class ChunkingService:
     """Service for chunking conversations and documents"""
     
@@ -62,6 +71,119 @@ class ChunkingService:
         
         return chunks
     
+    def _conversation_chunks(
+        self,
+        conversation_id: uuid.UUID,
+        messages: Iterable[Message],
+        start_index: int = 0
+    ) -> List[Chunk]:
+        """
+        Build the chunks for a conversation's messages without touching the database
+        
+        Args:
+            conversation_id: ID of the conversation the messages belong to
+            messages: Messages of the conversation
+            start_index: chunk_index of the first chunk built
+            
+        Returns:
+            List of unsaved chunks
+        """
+        chunks = []
+        chunk_index = start_index
+        
+        for message in messages:
+            # Split message content into chunks
+            message_chunks = self.split_text(message.content)
+            
+            for i, chunk_content in enumerate(message_chunks):
+                chunk = Chunk(
+                    conversation_id=conversation_id,
+                    content=chunk_content,
+                    chunk_index=chunk_index,
+                    chunk_type=message.role,
+                    message_id=message.id
+                )
+                chunks.append(chunk)
+                chunk_index += 1
+        
+        return chunks
+    
+    def _document_chunks(self, document: Document) -> List[DocumentChunk]:
+        """
+        Build the chunks for a document without touching the database
+        
+        Args:
+            document: Document to chunk
+            
+        Returns:
+            List of unsaved document chunks
+        """
+        # Split document content into chunks
+        content_chunks = self.split_text(document.content)
+        
+        return [
+            DocumentChunk(
+                document_id=document.id,
+                content=chunk_content,
+                chunk_index=i
+            )
+            for i, chunk_content in enumerate(content_chunks)
+        ]
+    
+    async def _chunk_conversation_in_session(self, session: AsyncSession, conversation_id: uuid.UUID) -> List[Chunk]:
+        """
+        Chunk all messages in a conversation and add the chunks to a session without committing
+        
+        Args:
+            session: Session to read the messages from and add the chunks to
+            conversation_id: ID of the conversation to chunk
+            
+        Returns:
+            List of added chunks
+        """
+        from sqlmodel import select
+        
+        # Stream the conversation's messages in batches so a long conversation
+        # is never held in memory as Message objects all at once
+        statement = (
+            select(Message)
+            .where(Message.conversation_id == conversation_id)
+            .execution_options(yield_per=CHUNK_MESSAGES_BATCH_SIZE)
+        )
+        result = await session.stream_scalars(statement)
+        
+        chunks = []
+        async for messages in result.partitions():
+            batch_chunks = self._conversation_chunks(conversation_id, messages, start_index=len(chunks))
+            # IDs and timestamps are generated client-side, so the chunks are
+            # complete without a refresh after the commit
+            session.add_all(batch_chunks)
+            chunks.extend(batch_chunks)
+        return chunks
+    
+    async def _chunk_document_in_session(self, session: AsyncSession, document_id: uuid.UUID) -> List[DocumentChunk]:
+        """
+        Chunk a document and add the chunks to a session without committing
+        
+        Args:
+            session: Session to read the document from and add the chunks to
+            document_id: ID of the document to chunk
+            
+        Returns:
+            List of added document chunks
+        """
+        # Get the document
+        document = await session.get(Document, document_id)
+        if not document:
+            raise ValueError(f"Document {document_id} not found")
+        
+        chunks = self._document_chunks(document)
+        
+        # IDs and timestamps are generated client-side, so the chunks are
+        # complete without a refresh after the commit
+        session.add_all(chunks)
+        return chunks
+    
     async def chunk_conversation(self, conversation_id: uuid.UUID) -> List[Chunk]:
         """
         Chunk all messages in a conversation
@@ -73,39 +195,10 @@ class ChunkingService:
             List of created chunks
         """
         async with AsyncSessionLocal() as session:
-            from sqlmodel import select
-            
-            # Get all messages for the conversation
-            statement = select(Message).where(Message.conversation_id == conversation_id)
-            result = await session.execute(statement)
-            messages = result.scalars().all()
-            
-            chunks = []
-            chunk_index = 0
-            
-            for message in messages:
-                # Split message content into chunks
-                message_chunks = self.split_text(message.content)
-                
-                for i, chunk_content in enumerate(message_chunks):
-                    chunk = Chunk(
-                        conversation_id=conversation_id,
-                        content=chunk_content,
-                        chunk_index=chunk_index,
-                        chunk_type=message.role,
-                        message_id=message.id
-                    )
-                    session.add(chunk)
-                    chunks.append(chunk)
-                    chunk_index += 1
-            
+            chunks = await self._chunk_conversation_in_session(session, conversation_id)
             await session.commit()
             
-            # Refresh all chunks to get their IDs
-            for chunk in chunks:
-                await session.refresh(chunk)
-            
-            logger.info(f"Created {len(chunks)} chunks for conversation {conversation_id}")
+            logger.debug(f"Created {len(chunks)} chunks for conversation {conversation_id}")
             return chunks
     
     async def chunk_document(self, document_id: uuid.UUID) -> List[DocumentChunk]:
@@ -119,33 +212,10 @@ class ChunkingService:
             List of created document chunks
         """
         async with AsyncSessionLocal() as session:
-            from sqlmodel import select
-            
-            # Get the document
-            document = await session.get(Document, document_id)
-            if not document:
-                raise ValueError(f"Document {document_id} not found")
-            
-            # Split document content into chunks
-            content_chunks = self.split_text(document.content)
-            
-            chunks = []
-            for i, chunk_content in enumerate(content_chunks):
-                chunk = DocumentChunk(
-                    document_id=document_id,
-                    content=chunk_content,
-                    chunk_index=i
-                )
-                session.add(chunk)
-                chunks.append(chunk)
-            
+            chunks = await self._chunk_document_in_session(session, document_id)
             await session.commit()
             
-            # Refresh all chunks to get their IDs
-            for chunk in chunks:
-                await session.refresh(chunk)
-            
-            logger.info(f"Created {len(chunks)} chunks for document {document_id}")
+            logger.debug(f"Created {len(chunks)} chunks for document {document_id}")
             return chunks
     
     async def re_chunk_conversation(self, conversation_id: uuid.UUID) -> List[Chunk]:
@@ -159,15 +229,16 @@ class ChunkingService:
             List of new chunks
         """
         async with AsyncSessionLocal() as session:
-            from sqlmodel import select, delete
+            from sqlmodel import delete
             
-            # Delete existing chunks
+            # Delete existing chunks and create the new ones in one transaction,
+            # so readers never see the conversation without chunks
             delete_statement = delete(Chunk).where(Chunk.conversation_id == conversation_id)
             await session.execute(delete_statement)
             
-            # Create new chunks
+            chunks = await self._chunk_conversation_in_session(session, conversation_id)
             await session.commit()
-            return await self.chunk_conversation(conversation_id)
+            return chunks
     
     async def re_chunk_document(self, document_id: uuid.UUID) -> List[DocumentChunk]:
         """
@@ -182,13 +253,13 @@ class ChunkingService:
         async with AsyncSessionLocal() as session:
             from sqlmodel import delete
             
-            # Delete existing chunks
+            # Delete existing chunks and create the new ones in one transaction
             delete_statement = delete(DocumentChunk).where(DocumentChunk.document_id == document_id)
             await session.execute(delete_statement)
             
-            # Create new chunks
+            chunks = await self._chunk_document_in_session(session, document_id)
             await session.commit()
-            return await self.chunk_document(document_id)
+            return chunks
     
     async def get_conversation_chunks(self, conversation_id: uuid.UUID) -> List[Chunk]:
         """
@@ -208,7 +279,7 @@ class ChunkingService:
                 .order_by(Chunk.chunk_index)
             )
             result = await session.execute(statement)
-            return list(result.scalars().all())
+            return result.scalars().all()
     
     async def get_document_chunks(self, document_id: uuid.UUID) -> List[DocumentChunk]:
         """
@@ -228,7 +299,7 @@ class ChunkingService:
                 .order_by(DocumentChunk.chunk_index)
             )
             result = await session.execute(statement)
-            return list(result.scalars().all())
+            return result.scalars().all()
     
     async def chunk_all_conversations(self) -> int:
         """
@@ -237,19 +308,52 @@ class ChunkingService:
         Returns:
             Total number of chunks created
         """
-        async with AsyncSessionLocal() as session:
-            from sqlmodel import select
-            statement = select(Conversation).where(Conversation.is_active == True)
-            result = await session.execute(statement)
-            conversations = result.scalars().all()
-            
-            total_chunks = 0
-            for conversation in conversations:
-                chunks = await self.chunk_conversation(conversation.id)
-                total_chunks += len(chunks)
+        from sqlmodel import select
+        
+        conversation_count = 0
+        total_chunks = 0
+        last_id = None
+        
+        # Walk the active conversations in id order, one page per transaction,
+        # seeking past the previous page instead of holding every row at once
+        while True:
+            async with AsyncSessionLocal() as session:
+                statement = (
+                    select(Conversation.id)
+                    .where(Conversation.is_active == True)
+                    .order_by(Conversation.id)
+                    .limit(CHUNK_ALL_PAGE_SIZE)
+                )
+                if last_id is not None:
+                    statement = statement.where(Conversation.id > last_id)
+                result = await session.execute(statement)
+                conversation_ids = result.scalars().all()
+                if not conversation_ids:
+                    break
+                
+                # Load the messages of the whole page in one query rather than
+                # one query (and session) per conversation
+                messages_by_conversation = defaultdict(list)
+                statement = select(Message).where(Message.conversation_id.in_(conversation_ids))
+                result = await session.execute(statement)
+                for message in result.scalars():
+                    messages_by_conversation[message.conversation_id].append(message)
+                
+                chunks = []
+                for conversation_id in conversation_ids:
+                    chunks.extend(
+                        self._conversation_chunks(conversation_id, messages_by_conversation[conversation_id])
+                    )
+                
+                session.add_all(chunks)
+                await session.commit()
             
-            logger.info(f"Chunked {len(conversations)} conversations, created {total_chunks} total chunks")
-            return total_chunks
+            conversation_count += len(conversation_ids)
+            total_chunks += len(chunks)
+            last_id = conversation_ids[-1]
+        
+        logger.info(f"Chunked {conversation_count} conversations, created {total_chunks} total chunks")
+        return total_chunks
     
     async def chunk_all_documents(self) -> int:
         """
@@ -258,16 +362,40 @@ class ChunkingService:
         Returns:
             Total number of chunks created
         """
-        async with AsyncSessionLocal() as session:
-            from sqlmodel import select
-            statement = select(Document).where(Document.is_active == True)
-            result = await session.execute(statement)
-            documents = result.scalars().all()
-            
-            total_chunks = 0
-            for document in documents:
-                chunks = await self.chunk_document(document.id)
-                total_chunks += len(chunks)
+        from sqlmodel import select
+        
+        document_count = 0
+        total_chunks = 0
+        last_id = None
+        
+        # Same paging as chunk_all_conversations
+        while True:
+            async with AsyncSessionLocal() as session:
+                statement = (
+                    select(Document)
+                    .where(Document.is_active == True)
+                    .order_by(Document.id)
+                    .limit(CHUNK_ALL_PAGE_SIZE)
+                )
+                if last_id is not None:
+                    statement = statement.where(Document.id > last_id)
+                result = await session.execute(statement)
+                documents = result.scalars().all()
+                if not documents:
+                    break
+                
+                # The documents are already loaded; chunk them here instead of
+                # re-fetching each one in its own session
+                chunks = []
+                for document in documents:
+                    chunks.extend(self._document_chunks(document))
+                
+                session.add_all(chunks)
+                await session.commit()
             
-            logger.info(f"Chunked {len(documents)} documents, created {total_chunks} total chunks")
-            return total_chunks
+            document_count += len(documents)
+            total_chunks += len(chunks)
+            last_id = documents[-1].id
+        
+        logger.info(f"Chunked {document_count} documents, created {total_chunks} total chunks")
+        return total_chunks
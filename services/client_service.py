@@ -2,8 +2,10 @@
 Service for managing clients and projects
 """
 import uuid
-from typing import List, Optional
-from sqlmodel import select, Session
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import tuple_
+from sqlmodel import select, update, Session
 from models import Client, Project, ClientCreate, ClientUpdate, ProjectCreate, ProjectUpdate
 
 
@@ -11,10 +13,10 @@ class ClientService:
     @staticmethod
     async def create_client(session: Session, client_data: ClientCreate) -> Client:
         """Create a new client"""
-        client = Client(**client_data.dict())
+        client = Client(**client_data.model_dump())
         session.add(client)
+        # id and timestamps are generated client-side, so no refresh is needed
         await session.commit()
-        await session.refresh(client)
         return client
 
     @staticmethod
@@ -34,18 +36,23 @@ class ClientService:
     @staticmethod
     async def update_client(session: Session, client_id: uuid.UUID, client_data: ClientUpdate) -> Optional[Client]:
         """Update client information"""
-        client = await session.get(Client, client_id)
-        if not client or not client.is_active:
-            return None
+        update_data = {
+            key: value for key, value in client_data.model_dump(exclude_unset=True).items()
+            if hasattr(Client, key)
+        }
+        if not update_data:
+            return await ClientService.get_client(session, client_id)
         
-        update_data = client_data.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            if hasattr(client, key):
-                setattr(client, key, value)
-        
-        session.add(client)
+        # One UPDATE ... RETURNING instead of loading, mutating and refreshing
+        statement = (
+            update(Client)
+            .where(Client.id == client_id, Client.is_active == True)
+            .values(**update_data)
+            .returning(Client)
+        )
+        result = await session.execute(statement)
+        client = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(client)
         return client
 
     @staticmethod
@@ -63,19 +70,29 @@ class ClientService:
     @staticmethod
     async def create_project(session: Session, project_data: ProjectCreate) -> Project:
         """Create a new project for a client"""
-        project = Project(**project_data.dict())
+        project = Project(**project_data.model_dump())
         session.add(project)
+        # id and timestamps are generated client-side, so no refresh is needed
         await session.commit()
-        await session.refresh(project)
         return project
 
     @staticmethod
     async def get_projects(session: Session, client_id: Optional[uuid.UUID] = None, 
-                          skip: int = 0, limit: int = 100) -> List[Project]:
-        """Get projects, optionally filtered by client"""
-        query = select(Project).where(Project.is_active == True).offset(skip).limit(limit)
+                          skip: int = 0, limit: int = 100,
+                          after: Optional[Tuple[datetime, uuid.UUID]] = None) -> List[Project]:
+        """Get projects ordered by (created_at, id), optionally filtered by client and starting after a given project"""
+        query = (
+            select(Project)
+            .where(Project.is_active == True)
+            .order_by(Project.created_at, Project.id)
+            .offset(skip)
+            .limit(limit)
+        )
         if client_id:
             query = query.where(Project.client_id == client_id)
+        if after:
+            # Keyset pagination: seek past the previous page instead of skipping rows
+            query = query.where(tuple_(Project.created_at, Project.id) > after)
         
         result = await session.execute(query)
         projects = result.scalars().all()
@@ -90,18 +107,23 @@ class ClientService:
     @staticmethod
     async def update_project(session: Session, project_id: uuid.UUID, project_data: ProjectUpdate) -> Optional[Project]:
         """Update project information"""
-        project = await session.get(Project, project_id)
-        if not project or not project.is_active:
-            return None
+        update_data = {
+            key: value for key, value in project_data.model_dump(exclude_unset=True).items()
+            if hasattr(Project, key)
+        }
+        if not update_data:
+            return await ClientService.get_project(session, project_id)
         
-        update_data = project_data.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            if hasattr(project, key):
-                setattr(project, key, value)
-        
-        session.add(project)
+        # One UPDATE ... RETURNING instead of loading, mutating and refreshing
+        statement = (
+            update(Project)
+            .where(Project.id == project_id, Project.is_active == True)
+            .values(**update_data)
+            .returning(Project)
+        )
+        result = await session.execute(statement)
+        project = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(project)
         return project
 
     @staticmethod
@@ -1,18 +1,57 @@
 """
 Service for managing content approval workflow
 """
+import time
 import uuid
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone
-from sqlmodel import select, Session
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import delete, select, update, Session
 from models import ContentStatus, Conversation, Project, User, ContentStatusCreate, ContentStatusUpdate
 from db import AsyncSessionLocal
 
+# The dashboard summary is cached in-process for this many seconds. Writes made
+# through this service clear it at once; other writers (admin, other processes)
+# show up after at most the TTL.
+SUMMARY_CACHE_TTL_SECONDS = 5
+
+_summary_cache: Dict[str, Any] = {"value": None, "expires": 0.0}
+
+
+# Dialects whose insert() supports ON CONFLICT DO UPDATE; others fall back to
+# SELECT then INSERT or UPDATE
+_UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+def _invalidate_summary() -> None:
+    _summary_cache["value"] = None
+
 
 class ContentStatusService:
     @staticmethod
     async def create_status(session: Session, status_data: ContentStatusCreate) -> ContentStatus:
         """Create a new content status entry or update existing one"""
+        upsert_insert = _UPSERT_INSERTS.get(session.bind.dialect.name)
+        if upsert_insert is not None:
+            # Insert, or update the conversation's existing status, in one
+            # round trip; RETURNING hands back the stored row
+            statement = (
+                upsert_insert(ContentStatus)
+                .values(**status_data.model_dump())
+                .on_conflict_do_update(
+                    index_elements=[ContentStatus.conversation_id],
+                    set_=status_data.model_dump(exclude_unset=True)
+                )
+                .returning(ContentStatus)
+                .execution_options(populate_existing=True)
+            )
+            result = await session.execute(statement)
+            content_status = result.scalar_one()
+            await session.commit()
+            _invalidate_summary()
+            return content_status
+        
         # Check if a ContentStatus already exists for this conversation
         existing_status = await session.execute(
             select(ContentStatus).where(ContentStatus.conversation_id == status_data.conversation_id)
@@ -28,6 +67,7 @@ class ContentStatusService:
             
             session.add(existing_status)
             await session.commit()
+            _invalidate_summary()
             await session.refresh(existing_status)
             return existing_status
         else:
@@ -35,15 +75,20 @@ class ContentStatusService:
             content_status = ContentStatus(**status_data.dict())
             session.add(content_status)
             await session.commit()
+            _invalidate_summary()
             await session.refresh(content_status)
             return content_status
 
     @staticmethod
     async def get_statuses(session: Session, conversation_id: Optional[uuid.UUID] = None,
                           project_id: Optional[uuid.UUID] = None, status: Optional[str] = None,
-                          skip: int = 0, limit: int = 100) -> List[ContentStatus]:
-        """Get content statuses with optional filters"""
-        query = select(ContentStatus).offset(skip).limit(limit)
+                          skip: int = 0, limit: int = 100,
+                          after_id: Optional[uuid.UUID] = None) -> List[ContentStatus]:
+        """Get content statuses ordered by id, with optional filters, starting after a given status"""
+        query = select(ContentStatus).order_by(ContentStatus.id).offset(skip).limit(limit)
+        if after_id:
+            # Keyset pagination: seek past the previous page instead of skipping rows
+            query = query.where(ContentStatus.id > after_id)
         if conversation_id:
             query = query.where(ContentStatus.conversation_id == conversation_id)
         if project_id:
@@ -52,7 +97,7 @@ class ContentStatusService:
             query = query.where(ContentStatus.status == status)
         
         result = await session.execute(query)
-        return list(result.scalars().all())
+        return result.scalars().all()
 
     @staticmethod
     async def get_status(session: Session, status_id: uuid.UUID) -> Optional[ContentStatus]:
@@ -62,29 +107,35 @@ class ContentStatusService:
     @staticmethod
     async def update_status(session: Session, status_id: uuid.UUID, status_data: ContentStatusUpdate) -> Optional[ContentStatus]:
         """Update content status"""
-        content_status = await session.get(ContentStatus, status_id)
-        if not content_status:
-            return None
+        update_data = {
+            key: value for key, value in status_data.dict(exclude_unset=True).items()
+            if hasattr(ContentStatus, key)
+        }
+        if not update_data:
+            return await ContentStatusService.get_status(session, status_id)
         
-        update_data = status_data.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            if hasattr(content_status, key):
-                setattr(content_status, key, value)
-        
-        session.add(content_status)
+        # One UPDATE ... RETURNING instead of loading, mutating and refreshing
+        statement = (
+            update(ContentStatus)
+            .where(ContentStatus.id == status_id)
+            .values(**update_data)
+            .returning(ContentStatus)
+        )
+        result = await session.execute(statement)
+        content_status = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(content_status)
+        _invalidate_summary()
         return content_status
 
     @staticmethod
     async def delete_status(session: Session, status_id: uuid.UUID) -> bool:
         """Delete a content status"""
-        content_status = await session.get(ContentStatus, status_id)
-        if not content_status:
+        result = await session.execute(delete(ContentStatus).where(ContentStatus.id == status_id))
+        if result.rowcount == 0:
             return False
         
-        await session.delete(content_status)
         await session.commit()
+        _invalidate_summary()
         return True
 
     @staticmethod
@@ -92,13 +143,19 @@ class ContentStatusService:
         """Get summary of content statuses for dashboard"""
         from sqlalchemy import func
         
+        if _summary_cache["value"] is not None and time.monotonic() < _summary_cache["expires"]:
+            return dict(_summary_cache["value"])
+        
         query = select(ContentStatus.status, func.count(ContentStatus.id).label('count')).group_by(ContentStatus.status)
         result = await session.execute(query)
         status_counts = {row[0]: row[1] for row in result.fetchall()}
         
         # Ensure all statuses are present with 0 count
         all_statuses = ['draft', 'review', 'approved', 'rejected', 'published']
-        return {status: status_counts.get(status, 0) for status in all_statuses}
+        summary = {status: status_counts.get(status, 0) for status in all_statuses}
+        _summary_cache["value"] = dict(summary)
+        _summary_cache["expires"] = time.monotonic() + SUMMARY_CACHE_TTL_SECONDS
+        return summary
 
     @staticmethod
     async def create_content_status(conversation_id: uuid.UUID, content_type: str,
@@ -117,6 +174,7 @@ class ContentStatusService:
             )
             session.add(content_status)
             await session.commit()
+            _invalidate_summary()
             await session.refresh(content_status)
             return content_status
 
@@ -138,22 +196,28 @@ class ContentStatusService:
                           review_notes: Optional[str] = None,
                           assigned_to: Optional[uuid.UUID] = None) -> bool:
         """Update content status by conversation ID"""
+        values: Dict[str, Any] = {"status": status}
+        if review_notes is not None:
+            values["review_notes"] = review_notes
+        if assigned_to is not None:
+            values["assigned_to"] = assigned_to
+        
+        if status == "published":
+            values["published_at"] = datetime.now(timezone.utc)
+        
         async with AsyncSessionLocal() as session:
-            content_status = await ContentStatusService.get_content_status(conversation_id, session)
-            if not content_status:
+            # Update in place; no matching row means the conversation has no status
+            statement = (
+                update(ContentStatus)
+                .where(ContentStatus.conversation_id == conversation_id)
+                .values(**values)
+            )
+            result = await session.execute(statement)
+            if result.rowcount == 0:
                 return False
             
-            content_status.status = status
-            if review_notes is not None:
-                content_status.review_notes = review_notes
-            if assigned_to is not None:
-                content_status.assigned_to = assigned_to
-            
-            if status == "published":
-                content_status.published_at = datetime.now(timezone.utc)
-            
-            session.add(content_status)
             await session.commit()
+            _invalidate_summary()
             return True
 
     @staticmethod
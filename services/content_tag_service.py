@@ -3,8 +3,16 @@ Service for managing content tags
 """
 import uuid
 from typing import List, Optional
-from sqlmodel import select, Session
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import delete, select, update, Session
 from models import ContentTag, ConversationTag, Conversation, ContentTagCreate, ContentTagUpdate
+from db import AsyncSessionLocal
+
+# Dialects whose insert() supports ON CONFLICT DO NOTHING; others fall back to
+# SELECT then INSERT
+_UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
 
 
 class ContentTagService:
@@ -18,83 +26,113 @@ class ContentTagService:
         return tag
 
     @staticmethod
-    async def get_tags(session: Session, skip: int = 0, limit: int = 100) -> List[ContentTag]:
-        """Get all content tags"""
-        query = select(ContentTag).where(ContentTag.is_active == True).offset(skip).limit(limit)
+    async def get_tags(session: Session, skip: int = 0, limit: int = 100,
+                       after_id: Optional[uuid.UUID] = None) -> List[ContentTag]:
+        """Get active content tags ordered by id, starting after a given tag"""
+        query = (
+            select(ContentTag)
+            .where(ContentTag.is_active == True)
+            .order_by(ContentTag.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        if after_id:
+            # Keyset pagination: seek past the previous page instead of skipping rows
+            query = query.where(ContentTag.id > after_id)
         result = await session.execute(query)
-        return list(result.scalars().all())
+        return result.scalars().all()
 
     @staticmethod
     async def get_tag(session: Session, tag_id: uuid.UUID) -> Optional[ContentTag]:
         """Get a specific tag by ID"""
-        return await session.get(ContentTag, tag_id)
+        tag = await session.get(ContentTag, tag_id)
+        return tag if tag and tag.is_active else None
 
     @staticmethod
     async def update_tag(session: Session, tag_id: uuid.UUID, tag_data: ContentTagUpdate) -> Optional[ContentTag]:
         """Update a content tag"""
-        tag = await session.get(ContentTag, tag_id)
-        if not tag or not tag.is_active:
-            return None
-        
-        update_data = tag_data.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            if hasattr(tag, key):
-                setattr(tag, key, value)
+        update_data = {
+            key: value for key, value in tag_data.dict(exclude_unset=True).items()
+            if hasattr(ContentTag, key)
+        }
+        if not update_data:
+            return await ContentTagService.get_tag(session, tag_id)
         
-        session.add(tag)
+        # One UPDATE ... RETURNING instead of loading, mutating and refreshing
+        statement = (
+            update(ContentTag)
+            .where(ContentTag.id == tag_id, ContentTag.is_active == True)
+            .values(**update_data)
+            .returning(ContentTag)
+        )
+        result = await session.execute(statement)
+        tag = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(tag)
         return tag
 
     @staticmethod
     async def delete_tag(session: Session, tag_id: uuid.UUID) -> bool:
         """Soft delete a content tag"""
-        tag = await session.get(ContentTag, tag_id)
-        if not tag or not tag.is_active:
-            return False
-        
-        tag.is_active = False
-        session.add(tag)
+        # Only an active tag matches, so a repeated delete reports False
+        statement = (
+            update(ContentTag)
+            .where(ContentTag.id == tag_id, ContentTag.is_active == True)
+            .values(is_active=False)
+        )
+        result = await session.execute(statement)
         await session.commit()
-        return True
+        return result.rowcount > 0
 
     @staticmethod
     async def add_tag_to_conversation(session: Session, conversation_id: uuid.UUID, tag_id: uuid.UUID) -> bool:
         """Add a tag to a conversation"""
-        # Check if tag already exists for this conversation
+        added = await ContentTagService.add_tags_to_conversation(session, conversation_id, [tag_id])
+        return added == 1  # 0 means it already exists
+
+    @staticmethod
+    async def add_tags_to_conversation(session: Session, conversation_id: uuid.UUID, tag_ids: List[uuid.UUID]) -> int:
+        """Add several tags to a conversation, skipping ones it already has; returns how many were added"""
+        tag_ids = list(dict.fromkeys(tag_ids))
+        if not tag_ids:
+            return 0
+        
+        upsert_insert = _UPSERT_INSERTS.get(session.bind.dialect.name)
+        if upsert_insert is not None:
+            # One INSERT for every tag; existing pairs are skipped by the
+            # unique (conversation_id, tag_id) index
+            statement = upsert_insert(ConversationTag).values([
+                {"conversation_id": conversation_id, "tag_id": tag_id} for tag_id in tag_ids
+            ]).on_conflict_do_nothing(index_elements=["conversation_id", "tag_id"])
+            result = await session.execute(statement)
+            await session.commit()
+            return result.rowcount
+        
+        # Check which tags the conversation already has
         existing = await session.execute(
-            select(ConversationTag).where(
+            select(ConversationTag.tag_id).where(
                 ConversationTag.conversation_id == conversation_id,
-                ConversationTag.tag_id == tag_id
+                ConversationTag.tag_id.in_(tag_ids)
             )
         )
-        if existing.scalar_one_or_none():
-            return False  # Already exists
-        
-        conversation_tag = ConversationTag(
-            conversation_id=conversation_id,
-            tag_id=tag_id
-        )
-        session.add(conversation_tag)
+        existing_tag_ids = set(existing.scalars().all())
+        new_tags = [
+            ConversationTag(conversation_id=conversation_id, tag_id=tag_id)
+            for tag_id in tag_ids if tag_id not in existing_tag_ids
+        ]
+        session.add_all(new_tags)
         await session.commit()
-        return True
+        return len(new_tags)
 
     @staticmethod
     async def remove_tag_from_conversation(session: Session, conversation_id: uuid.UUID, tag_id: uuid.UUID) -> bool:
         """Remove a tag from a conversation"""
-        result = await session.execute(
-            select(ConversationTag).where(
-                ConversationTag.conversation_id == conversation_id,
-                ConversationTag.tag_id == tag_id
-            )
+        statement = delete(ConversationTag).where(
+            ConversationTag.conversation_id == conversation_id,
+            ConversationTag.tag_id == tag_id
         )
-        conversation_tag = result.scalar_one_or_none()
-        if not conversation_tag:
-            return False
-        
-        await session.delete(conversation_tag)
+        result = await session.execute(statement)
         await session.commit()
-        return True
+        return result.rowcount > 0
 
     @staticmethod
     async def get_conversation_tags(session: Session, conversation_id: uuid.UUID) -> List[ContentTag]:
@@ -104,7 +142,7 @@ class ContentTagService:
             ContentTag.is_active == True
         )
         result = await session.execute(query)
-        return list(result.scalars().all())
+        return result.scalars().all()
 
     @staticmethod
     async def get_tags_legacy(active_only: bool = True) -> List[ContentTag]:
@@ -115,95 +153,7 @@ class ContentTagService:
                 query = query.where(ContentTag.is_active == True)
             
             result = await session.execute(query)
-            tags = result.scalars().all()
-            return list(tags)
-
-    @staticmethod
-    async def get_tag(tag_id: uuid.UUID) -> Optional[ContentTag]:
-        """Get a specific tag by ID"""
-        async with AsyncSessionLocal() as session:
-            tag = await session.get(ContentTag, tag_id)
-            return tag if tag and tag.is_active else None
-
-    @staticmethod
-    async def update_tag(tag_id: uuid.UUID, **kwargs) -> bool:
-        """Update tag information"""
-        async with AsyncSessionLocal() as session:
-            tag = await session.get(ContentTag, tag_id)
-            if not tag or not tag.is_active:
-                return False
-            
-            for key, value in kwargs.items():
-                if hasattr(tag, key) and value is not None:
-                    setattr(tag, key, value)
-            
-            session.add(tag)
-            await session.commit()
-            return True
-
-    @staticmethod
-    async def delete_tag(tag_id: uuid.UUID) -> bool:
-        """Soft delete a tag"""
-        async with AsyncSessionLocal() as session:
-            tag = await session.get(ContentTag, tag_id)
-            if not tag or not tag.is_active:
-                return False
-            
-            tag.is_active = False
-            session.add(tag)
-            await session.commit()
-            return True
-
-    @staticmethod
-    async def add_tag_to_conversation(conversation_id: uuid.UUID, tag_id: uuid.UUID) -> bool:
-        """Add a tag to a conversation"""
-        async with AsyncSessionLocal() as session:
-            # Check if tag already exists for this conversation
-            existing_query = select(ConversationTag).where(
-                ConversationTag.conversation_id == conversation_id,
-                ConversationTag.tag_id == tag_id
-            )
-            result = await session.execute(existing_query)
-            if result.scalar_one_or_none():
-                return True  # Tag already exists
-            
-            conversation_tag = ConversationTag(
-                conversation_id=conversation_id,
-                tag_id=tag_id
-            )
-            session.add(conversation_tag)
-            await session.commit()
-            return True
-
-    @staticmethod
-    async def remove_tag_from_conversation(conversation_id: uuid.UUID, tag_id: uuid.UUID) -> bool:
-        """Remove a tag from a conversation"""
-        async with AsyncSessionLocal() as session:
-            query = select(ConversationTag).where(
-                ConversationTag.conversation_id == conversation_id,
-                ConversationTag.tag_id == tag_id
-            )
-            result = await session.execute(query)
-            conversation_tag = result.scalar_one_or_none()
-            
-            if conversation_tag:
-                await session.delete(conversation_tag)
-                await session.commit()
-                return True
-            return False
-
-    @staticmethod
-    async def get_conversation_tags(conversation_id: uuid.UUID) -> List[ContentTag]:
-        """Get all tags for a conversation"""
-        async with AsyncSessionLocal() as session:
-            query = select(ContentTag).join(ConversationTag).where(
-                ConversationTag.conversation_id == conversation_id,
-                ContentTag.is_active == True
-            )
-            
-            result = await session.execute(query)
-            tags = result.scalars().all()
-            return list(tags)
+            return result.scalars().all()
 
     @staticmethod
     async def get_conversations_by_tag(tag_id: uuid.UUID) -> List[Conversation]:
@@ -215,36 +165,30 @@ class ContentTagService:
             )
             
             result = await session.execute(query)
-            conversations = result.scalars().all()
-            return list(conversations)
+            return result.scalars().all()
 
     @staticmethod
     async def get_tag_usage_stats() -> List[dict]:
         """Get usage statistics for all tags"""
         async with AsyncSessionLocal() as session:
+            # Count each tag's conversations in the database so one row per
+            # tag comes back instead of one per tag/conversation pair
             query = select(
                 ContentTag.id,
                 ContentTag.name,
                 ContentTag.color,
                 ContentTag.description,
-                ConversationTag.id
-            ).outerjoin(ConversationTag).where(ContentTag.is_active == True)
+                func.count(ConversationTag.id)
+            ).outerjoin(ConversationTag).where(ContentTag.is_active == True).group_by(ContentTag.id)
             
             result = await session.execute(query)
-            rows = result.all()
-            
-            tag_stats = {}
-            for row in rows:
-                tag_id, name, color, description, conversation_tag_id = row
-                if tag_id not in tag_stats:
-                    tag_stats[tag_id] = {
-                        "id": tag_id,
-                        "name": name,
-                        "color": color,
-                        "description": description,
-                        "usage_count": 0
-                    }
-                if conversation_tag_id:
-                    tag_stats[tag_id]["usage_count"] += 1
-            
-            return list(tag_stats.values())
+            return [
+                {
+                    "id": tag_id,
+                    "name": name,
+                    "color": color,
+                    "description": description,
+                    "usage_count": usage_count
+                }
+                for tag_id, name, color, description, usage_count in result
+            ]
@@ -1,22 +1,36 @@
 """
 Service for managing content templates
 """
+import re
 import uuid
-import json
-from typing import List, Optional, Dict, Any
-from sqlmodel import select, Session
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
+from sqlmodel import select, update, Session
 from models import ContentTemplate, ContentTemplateCreate, ContentTemplateUpdate
+from db import AsyncSessionLocal
+
+# A {name} placeholder in a template prompt
+_PLACEHOLDER_RE = re.compile(r"\{([^{}]*)\}")
+
+
+@lru_cache(maxsize=1024)
+def _render(template_prompt: str, template_vars: Tuple[str, ...], values: Tuple[Tuple[str, str], ...]) -> str:
+    """Render a template prompt; keyed on the template's own text, so edits miss the cache"""
+    # Only declared variables that were given a value are substituted
+    values_by_name = {name: value for name, value in values if name in template_vars}
+    
+    # Replace every placeholder in one pass over the prompt
+    return _PLACEHOLDER_RE.sub(
+        lambda match: values_by_name.get(match.group(1), match.group(0)),
+        template_prompt
+    )
 
 
 class ContentTemplateService:
     @staticmethod
     async def create_template(session: Session, template_data: ContentTemplateCreate) -> ContentTemplate:
         """Create a new content template"""
-        template_dict = template_data.dict()
-        if template_dict.get('variables'):
-            template_dict['variables'] = json.dumps(template_dict['variables'])
-        
-        template = ContentTemplate(**template_dict)
+        template = ContentTemplate(**template_data.dict())
         session.add(template)
         await session.commit()
         await session.refresh(template)
@@ -24,15 +38,24 @@ class ContentTemplateService:
 
     @staticmethod
     async def get_templates(session: Session, content_type: Optional[str] = None, 
-                           skip: int = 0, limit: int = 100) -> List[ContentTemplate]:
-        """Get content templates, optionally filtered by type"""
-        query = select(ContentTemplate).where(ContentTemplate.is_active == True).offset(skip).limit(limit)
+                           skip: int = 0, limit: int = 100,
+                           after_id: Optional[uuid.UUID] = None) -> List[ContentTemplate]:
+        """Get content templates ordered by id, optionally filtered by type and starting after a given template"""
+        query = (
+            select(ContentTemplate)
+            .where(ContentTemplate.is_active == True)
+            .order_by(ContentTemplate.id)
+            .offset(skip)
+            .limit(limit)
+        )
         if content_type:
             query = query.where(ContentTemplate.content_type == content_type)
+        if after_id:
+            # Keyset pagination: seek past the previous page instead of skipping rows
+            query = query.where(ContentTemplate.id > after_id)
         
         result = await session.execute(query)
-        templates = result.scalars().all()
-        return list(templates)
+        return result.scalars().all()
 
     @staticmethod
     async def get_template(session: Session, template_id: uuid.UUID) -> Optional[ContentTemplate]:
@@ -43,53 +66,50 @@ class ContentTemplateService:
     @staticmethod
     async def update_template(session: Session, template_id: uuid.UUID, template_data: ContentTemplateUpdate) -> Optional[ContentTemplate]:
         """Update template information"""
-        template = await session.get(ContentTemplate, template_id)
-        if not template or not template.is_active:
-            return None
-        
-        update_data = template_data.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            if hasattr(template, key):
-                if key == 'variables' and isinstance(value, list):
-                    setattr(template, key, json.dumps(value))
-                else:
-                    setattr(template, key, value)
+        update_data = {
+            key: value for key, value in template_data.dict(exclude_unset=True).items()
+            if hasattr(ContentTemplate, key)
+        }
+        if not update_data:
+            return await ContentTemplateService.get_template(session, template_id)
         
-        session.add(template)
+        # One UPDATE ... RETURNING instead of loading, mutating and refreshing
+        statement = (
+            update(ContentTemplate)
+            .where(ContentTemplate.id == template_id, ContentTemplate.is_active == True)
+            .values(**update_data)
+            .returning(ContentTemplate)
+        )
+        result = await session.execute(statement)
+        template = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(template)
         return template
 
     @staticmethod
     async def delete_template(session: Session, template_id: uuid.UUID) -> bool:
         """Soft delete a template"""
-        template = await session.get(ContentTemplate, template_id)
-        if not template or not template.is_active:
-            return False
-        
-        template.is_active = False
-        session.add(template)
+        # Only an active template matches, so a repeated delete reports False
+        statement = (
+            update(ContentTemplate)
+            .where(ContentTemplate.id == template_id, ContentTemplate.is_active == True)
+            .values(is_active=False)
+        )
+        result = await session.execute(statement)
         await session.commit()
-        return True
+        return result.rowcount > 0
 
     @staticmethod
-    async def render_template(template_id: uuid.UUID, variables: Dict[str, Any]) -> Optional[str]:
+    async def render_template(session: Session, template_id: uuid.UUID, variables: Dict[str, Any]) -> Optional[str]:
         """Render a template with provided variables"""
-        template = await ContentTemplateService.get_template(template_id)
+        template = await ContentTemplateService.get_template(session, template_id)
         if not template:
             return None
         
         try:
-            # Parse template variables
-            template_vars = json.loads(template.variables) if template.variables else []
-            
-            # Replace variables in the template prompt
-            rendered_prompt = template.template_prompt
-            for var in template_vars:
-                if var in variables:
-                    rendered_prompt = rendered_prompt.replace(f"{{{var}}}", str(variables[var]))
-            
-            return rendered_prompt
+            # Values are substituted as strings, so their string forms make a
+            # hashable cache key
+            values = tuple(sorted((name, str(value)) for name, value in variables.items()))
+            return _render(template.template_prompt, tuple(template.variables or ()), values)
         except Exception:
             return None
 
@@ -102,5 +122,4 @@ class ContentTemplateService:
             ).distinct()
             
             result = await session.execute(query)
-            content_types = result.scalars().all()
-            return list(content_types)
+            return result.scalars().all()
@@ -3,15 +3,31 @@ Embedding Service for generating and managing embeddings using OpenAI API
 """
 import os
 import uuid
+import httpx
 import numpy as np
 from typing import List, Optional, Tuple
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from models import Chunk, ChunkEmbedding, DocumentChunk, DocumentChunkEmbedding
 from db import AsyncSessionLocal
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _http_client() -> DefaultAsyncHttpxClient:
+    """HTTP client for embedding requests; multiplexes them over HTTP/2 when h2 is installed"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        http2 = False
+    else:
+        http2 = True
+    return DefaultAsyncHttpxClient(
+        http2=http2,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    )
+
+
 class EmbeddingService:
     """Service for generating and managing embeddings"""
     
@@ -22,10 +38,26 @@ class EmbeddingService:
             logger.warning("OPENAI_API_KEY not found in environment variables")
             self.client = None
         else:
-            self.client = AsyncOpenAI(api_key=api_key)
+            self.client = AsyncOpenAI(api_key=api_key, http_client=_http_client())
         self.model_name = "text-embedding-3-small"  # 1536 dimensions
         self.embedding_dimension = 1536
     
+    async def warm_up(self) -> None:
+        """
+        Open a connection to the embeddings endpoint ahead of real requests
+        
+        Sends a one-token request so DNS lookup, TLS handshake and client setup
+        are paid before the first batch. Failures are logged and ignored; the
+        real requests report their own errors.
+        """
+        if not self.client:
+            return
+        
+        try:
+            await self.client.embeddings.create(model=self.model_name, input="warmup")
+        except Exception as e:
+            logger.warning(f"Embedding endpoint warm-up failed: {e}")
+    
     async def generate_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for a single text using OpenAI API
@@ -50,22 +82,34 @@ class EmbeddingService:
             logger.error(f"Failed to generate embedding: {e}")
             raise
     
-    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    async def generate_embeddings_batch(
+        self, 
+        texts: List[str], 
+        batch_size: int = 128
+    ) -> List[List[float]]:
         """
         Generate embeddings for multiple texts in batch using OpenAI API
         
         Args:
             texts: List of texts to embed
+            batch_size: Maximum number of texts sent in one API request
             
         Returns:
-            List of embeddings
+            List of embeddings, in the same order as texts
         """
+        if not self.client:
+            logger.error("OpenAI client not initialized - OPENAI_API_KEY not configured")
+            raise Exception("OpenAI API key not configured")
+        
         try:
-            response = await self.client.embeddings.create(
-                model=self.model_name,
-                input=texts
-            )
-            return [data.embedding for data in response.data]
+            embeddings = []
+            for start in range(0, len(texts), batch_size):
+                response = await self.client.embeddings.create(
+                    model=self.model_name,
+                    input=texts[start:start + batch_size]
+                )
+                embeddings.extend(data.embedding for data in response.data)
+            return embeddings
         except Exception as e:
             logger.error(f"Failed to generate batch embeddings: {e}")
             raise
@@ -132,6 +176,60 @@ class EmbeddingService:
             await session.refresh(chunk_embedding)
             return chunk_embedding
     
+    async def store_chunk_embeddings_bulk(
+        self, 
+        pairs: List[Tuple[uuid.UUID, List[float]]]
+    ) -> List[ChunkEmbedding]:
+        """
+        Store embeddings for many conversation chunks in one transaction
+        
+        Args:
+            pairs: List of (chunk_id, embedding) tuples
+            
+        Returns:
+            List of ChunkEmbedding objects
+        """
+        async with AsyncSessionLocal() as session:
+            chunk_embeddings = [
+                ChunkEmbedding(
+                    chunk_id=chunk_id,
+                    embedding=self.float32_to_bytes(embedding),
+                    model_name=self.model_name,
+                    embedding_dimension=self.embedding_dimension
+                )
+                for chunk_id, embedding in pairs
+            ]
+            session.add_all(chunk_embeddings)
+            await session.commit()
+            return chunk_embeddings
+    
+    async def store_document_chunk_embeddings_bulk(
+        self, 
+        pairs: List[Tuple[uuid.UUID, List[float]]]
+    ) -> List[DocumentChunkEmbedding]:
+        """
+        Store embeddings for many document chunks in one transaction
+        
+        Args:
+            pairs: List of (chunk_id, embedding) tuples
+            
+        Returns:
+            List of DocumentChunkEmbedding objects
+        """
+        async with AsyncSessionLocal() as session:
+            chunk_embeddings = [
+                DocumentChunkEmbedding(
+                    chunk_id=chunk_id,
+                    embedding=self.float32_to_bytes(embedding),
+                    model_name=self.model_name,
+                    embedding_dimension=self.embedding_dimension
+                )
+                for chunk_id, embedding in pairs
+            ]
+            session.add_all(chunk_embeddings)
+            await session.commit()
+            return chunk_embeddings
+    
     async def get_chunk_embedding(self, chunk_id: uuid.UUID) -> Optional[List[float]]:
         """
         Retrieve embedding for a chunk
@@ -208,6 +306,40 @@ class EmbeddingService:
                 for ce in chunk_embeddings
             ]
     
+    def _embedding_matrix(self, rows) -> Tuple[List[uuid.UUID], np.ndarray]:
+        """Decode (chunk_id, embedding bytes) rows into ids and one float32 matrix"""
+        chunk_ids = [chunk_id for chunk_id, _ in rows]
+        matrix = np.frombuffer(
+            b"".join(embedding for _, embedding in rows), dtype=np.float32
+        ).reshape(len(rows), self.embedding_dimension)
+        return chunk_ids, matrix
+    
+    async def get_all_chunk_embedding_matrix(self) -> Tuple[List[uuid.UUID], np.ndarray]:
+        """
+        Get all chunk embeddings as a single matrix for building FAISS index
+        
+        Returns:
+            Tuple of (chunk_ids, matrix) where matrix row i is the embedding of chunk_ids[i]
+        """
+        async with AsyncSessionLocal() as session:
+            from sqlmodel import select
+            statement = select(ChunkEmbedding.chunk_id, ChunkEmbedding.embedding)
+            result = await session.execute(statement)
+            return self._embedding_matrix(result.all())
+    
+    async def get_all_document_chunk_embedding_matrix(self) -> Tuple[List[uuid.UUID], np.ndarray]:
+        """
+        Get all document chunk embeddings as a single matrix for building FAISS index
+        
+        Returns:
+            Tuple of (chunk_ids, matrix) where matrix row i is the embedding of chunk_ids[i]
+        """
+        async with AsyncSessionLocal() as session:
+            from sqlmodel import select
+            statement = select(DocumentChunkEmbedding.chunk_id, DocumentChunkEmbedding.embedding)
+            result = await session.execute(statement)
+            return self._embedding_matrix(result.all())
+    
     async def test_connection(self) -> dict:
         """
         Test the embedding service connection
@@ -6,6 +6,7 @@ from typing import List, Optional
 from sqlmodel import select, func
 from models import ConversationFolder, Conversation, Message
 from db import AsyncSessionLocal
+from services.chat_history_service import ChatHistoryService
 
 
 class FolderService:
@@ -115,6 +116,8 @@ class FolderService:
             folder.is_active = False
             session.add(folder)
             await session.commit()
+            for conversation in conversations:
+                ChatHistoryService.invalidate_cached_conversation(conversation.id)
             return True
 
     @staticmethod
@@ -135,6 +138,7 @@ class FolderService:
             conversation.folder_id = folder_id
             session.add(conversation)
             await session.commit()
+            ChatHistoryService.invalidate_cached_conversation(conversation_id)
             return True
 
     @staticmethod
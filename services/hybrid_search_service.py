@@ -16,6 +16,11 @@ logger = logging.getLogger(__name__)
 class HybridSearchService:
     """Service for hybrid search combining keyword and semantic search"""
     
+    # FAISS index selection: flat below HNSW_MIN_VECTORS, HNSW graph above
+    HNSW_MIN_VECTORS = 10000
+    HNSW_NEIGHBORS = 32
+    HNSW_EF_SEARCH = 64
+    
     def __init__(self, embedding_service: EmbeddingService):
         self.embedding_service = embedding_service
         self.faiss_index = None
@@ -25,21 +30,29 @@ class HybridSearchService:
         
     async def build_faiss_index(self) -> None:
         """Build FAISS index from all stored embeddings"""
-        # Get all chunk embeddings
-        chunk_embeddings = await self.embedding_service.get_all_chunk_embeddings()
-        doc_chunk_embeddings = await self.embedding_service.get_all_document_chunk_embeddings()
+        # Get all chunk embeddings, decoded straight from the stored bytes
+        chunk_ids, chunk_matrix = await self.embedding_service.get_all_chunk_embedding_matrix()
+        doc_chunk_ids, doc_chunk_matrix = await self.embedding_service.get_all_document_chunk_embedding_matrix()
         
-        all_embeddings = chunk_embeddings + doc_chunk_embeddings
+        all_chunk_ids = chunk_ids + doc_chunk_ids
         
-        if not all_embeddings:
+        if not all_chunk_ids:
             logger.warning("No embeddings found to build FAISS index")
             return
         
-        # Create FAISS index
-        self.faiss_index = faiss.IndexFlatIP(self.embedding_dimension)  # Inner product for cosine similarity
+        # Create FAISS index (inner product for cosine similarity). Exact search is
+        # cheap for small corpora; past HNSW_MIN_VECTORS switch to an HNSW graph so
+        # queries stop scanning every vector.
+        if len(all_chunk_ids) >= self.HNSW_MIN_VECTORS:
+            self.faiss_index = faiss.IndexHNSWFlat(
+                self.embedding_dimension, self.HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT
+            )
+            self.faiss_index.hnsw.efSearch = self.HNSW_EF_SEARCH
+        else:
+            self.faiss_index = faiss.IndexFlatIP(self.embedding_dimension)
         
-        # Prepare embeddings array
-        embeddings_array = np.array([emb for _, emb in all_embeddings], dtype=np.float32)
+        # Prepare one contiguous embeddings array
+        embeddings_array = np.concatenate((chunk_matrix, doc_chunk_matrix))
         
         # Normalize embeddings for cosine similarity
         faiss.normalize_L2(embeddings_array)
@@ -48,10 +61,10 @@ class HybridSearchService:
         self.faiss_index.add(embeddings_array)
         
         # Build mapping dictionaries
-        self.chunk_id_to_index = {chunk_id: i for i, (chunk_id, _) in enumerate(all_embeddings)}
-        self.index_to_chunk_id = {i: chunk_id for i, (chunk_id, _) in enumerate(all_embeddings)}
+        self.chunk_id_to_index = {chunk_id: i for i, chunk_id in enumerate(all_chunk_ids)}
+        self.index_to_chunk_id = dict(enumerate(all_chunk_ids))
         
-        logger.info(f"Built FAISS index with {len(all_embeddings)} embeddings")
+        logger.info(f"Built FAISS index with {len(all_chunk_ids)} embeddings")
     
     async def keyword_search(
         self, 
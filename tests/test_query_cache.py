@@ -0,0 +1,44 @@
+"""
+Checks that repeated service queries reuse SQLAlchemy's compiled statement cache
+"""
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+import models  # noqa: F401  (registers every table on SQLModel.metadata)
+from db import QUERY_CACHE_SIZE
+from services.content_status_service import ContentStatusService
+
+
+async def _get_statuses_twice():
+    engine = create_async_engine("sqlite+aiosqlite://", query_cache_size=QUERY_CACHE_SIZE)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+        session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            # Same filters with different values, so the statement shape is unchanged
+            await ContentStatusService.get_statuses(session, status="draft", limit=10)
+            await ContentStatusService.get_statuses(session, status="review", limit=20)
+    finally:
+        await engine.dispose()
+
+
+def test_get_statuses_reuses_compiled_statement(caplog):
+    # The engine logs each statement's parameters with "[generated in ...]" on
+    # a cache miss and "[cached since ...]" on a hit
+    caplog.set_level(logging.INFO, logger="sqlalchemy.engine.Engine")
+
+    asyncio.run(_get_statuses_twice())
+
+    markers = [
+        record.getMessage() for record in caplog.records
+        if record.getMessage().startswith(("[generated in", "[cached since"))
+    ]
+    # The last two statements are the two content_status SELECTs
+    first, second = markers[-2:]
+    assert first.startswith("[generated in")
+    assert second.startswith("[cached since")